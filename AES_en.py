@@ -1,57 +1,116 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# =========================================
+# Shared Tables
+# =========================================
+
+# The S-Box (Substitution Box)
+# A pre-computed lookup table used for non-linearity.
+# Shared by every AES instance instead of being rebuilt per key.
+S_BOX = (
+    0x63, 0x7c, 0x77, 0x7b, 0xf2, 0x6b, 0x6f, 0xc5, 0x30, 0x01, 0x67, 0x2b, 0xfe, 0xd7, 0xab, 0x76,
+    0xca, 0x82, 0xc9, 0x7d, 0xfa, 0x59, 0x47, 0xf0, 0xad, 0xd4, 0xa2, 0xaf, 0x9c, 0xa4, 0x72, 0xc0,
+    0xb7, 0xfd, 0x93, 0x26, 0x36, 0x3f, 0xf7, 0xcc, 0x34, 0xa5, 0xe5, 0xf1, 0x71, 0xd8, 0x31, 0x15,
+    0x04, 0xc7, 0x23, 0xc3, 0x18, 0x96, 0x05, 0x9a, 0x07, 0x12, 0x80, 0xe2, 0xeb, 0x27, 0xb2, 0x75,
+    0x09, 0x83, 0x2c, 0x1a, 0x1b, 0x6e, 0x5a, 0xa0, 0x52, 0x3b, 0xd6, 0xb3, 0x29, 0xe3, 0x2f, 0x84,
+    0x53, 0xd1, 0x00, 0xed, 0x20, 0xfc, 0xb1, 0x5b, 0x6a, 0xcb, 0xbe, 0x39, 0x4a, 0x4c, 0x58, 0xcf,
+    0xd0, 0xef, 0xaa, 0xfb, 0x43, 0x4d, 0x33, 0x85, 0x45, 0xf9, 0x02, 0x7f, 0x50, 0x3c, 0x9f, 0xa8,
+    0x51, 0xa3, 0x40, 0x8f, 0x92, 0x9d, 0x38, 0xf5, 0xbc, 0xb6, 0xda, 0x21, 0x10, 0xff, 0xf3, 0xd2,
+    0xcd, 0x0c, 0x13, 0xec, 0x5f, 0x97, 0x44, 0x17, 0xc4, 0xa7, 0x7e, 0x3d, 0x64, 0x5d, 0x19, 0x73,
+    0x60, 0x81, 0x4f, 0xdc, 0x22, 0x2a, 0x90, 0x88, 0x46, 0xee, 0xb8, 0x14, 0xde, 0x5e, 0x0b, 0xdb,
+    0xe0, 0x32, 0x3a, 0x0a, 0x49, 0x06, 0x24, 0x5c, 0xc2, 0xd3, 0xac, 0x62, 0x91, 0x95, 0xe4, 0x79,
+    0xe7, 0xc8, 0x37, 0x6d, 0x8d, 0xd5, 0x4e, 0xa9, 0x6c, 0x56, 0xf4, 0xea, 0x65, 0x7a, 0xae, 0x08,
+    0xba, 0x78, 0x25, 0x2e, 0x1c, 0xa6, 0xb4, 0xc6, 0xe8, 0xdd, 0x74, 0x1f, 0x4b, 0xbd, 0x8b, 0x8a,
+    0x70, 0x3e, 0xb5, 0x66, 0x48, 0x03, 0xf6, 0x0e, 0x61, 0x35, 0x57, 0xb9, 0x86, 0xc1, 0x1d, 0x9e,
+    0xe1, 0xf8, 0x98, 0x11, 0x69, 0xd9, 0x8e, 0x94, 0x9b, 0x1e, 0x87, 0xe9, 0xce, 0x55, 0x28, 0xdf,
+    0x8c, 0xa1, 0x89, 0x0d, 0xbf, 0xe6, 0x42, 0x68, 0x41, 0x99, 0x2d, 0x0f, 0xb0, 0x54, 0xbb, 0x16
+)
+
+# Inverse S-Box, used by InvSubBytes when decrypting
+INV_S_BOX = [0] * 256
+for _i, _s in enumerate(S_BOX):
+    INV_S_BOX[_s] = _i
+INV_S_BOX = tuple(INV_S_BOX)
+
+# R-Con (Round Constants) used in Key Expansion
+# 10 entries (plus the unused 0th) cover AES-128, AES-192 and AES-256.
+R_CON = (
+    0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36
+)
+
+# Supported key sizes: key length in bytes -> number of rounds
+ROUNDS = {16: 10, 24: 12, 32: 14}
+
+# Number of expanded key schedules kept in memory (least recently used
+# keys are evicted first)
+KEY_SCHEDULE_CACHE_SIZE = 4096
+
+
+def gmul(a, b):
+    # Galois Field multiplication of a and b in GF(2^8)
+    p = 0
+    for _ in range(8):
+        if b & 1:
+            p ^= a
+        hi_bit_set = a & 0x80
+        a = (a << 1) & 0xFF
+        if hi_bit_set:
+            a ^= 0x1b # The irreducible polynomial for AES
+        b >>= 1
+    return p
+
+# Multiplication tables for the InvMixColumns coefficients (9, 11, 13, 14)
+MUL9 = tuple(gmul(x, 9) for x in range(256))
+MUL11 = tuple(gmul(x, 11) for x in range(256))
+MUL13 = tuple(gmul(x, 13) for x in range(256))
+MUL14 = tuple(gmul(x, 14) for x in range(256))
+
+
 class AES:
     def __init__(self, key):
-        # AES-128 requires a 16-byte key
-        if len(key) != 16:
-            raise ValueError("Key must be exactly 16 bytes long for AES-128")
-        
-        # The S-Box (Substitution Box)
-        # A pre-computed lookup table used for non-linearity.
-        self.s_box = [
-            0x63, 0x7c, 0x77, 0x7b, 0xf2, 0x6b, 0x6f, 0xc5, 0x30, 0x01, 0x67, 0x2b, 0xfe, 0xd7, 0xab, 0x76,
-            0xca, 0x82, 0xc9, 0x7d, 0xfa, 0x59, 0x47, 0xf0, 0xad, 0xd4, 0xa2, 0xaf, 0x9c, 0xa4, 0x72, 0xc0,
-            0xb7, 0xfd, 0x93, 0x26, 0x36, 0x3f, 0xf7, 0xcc, 0x34, 0xa5, 0xe5, 0xf1, 0x71, 0xd8, 0x31, 0x15,
-            0x04, 0xc7, 0x23, 0xc3, 0x18, 0x96, 0x05, 0x9a, 0x07, 0x12, 0x80, 0xe2, 0xeb, 0x27, 0xb2, 0x75,
-            0x09, 0x83, 0x2c, 0x1a, 0x1b, 0x6e, 0x5a, 0xa0, 0x52, 0x3b, 0xd6, 0xb3, 0x29, 0xe3, 0x2f, 0x84,
-            0x53, 0xd1, 0x00, 0xed, 0x20, 0xfc, 0xb1, 0x5b, 0x6a, 0xcb, 0xbe, 0x39, 0x4a, 0x4c, 0x58, 0xcf,
-            0xd0, 0xef, 0xaa, 0xfb, 0x43, 0x4d, 0x33, 0x85, 0x45, 0xf9, 0x02, 0x7f, 0x50, 0x3c, 0x9f, 0xa8,
-            0x51, 0xa3, 0x40, 0x8f, 0x92, 0x9d, 0x38, 0xf5, 0xbc, 0xb6, 0xda, 0x21, 0x10, 0xff, 0xf3, 0xd2,
-            0xcd, 0x0c, 0x13, 0xec, 0x5f, 0x97, 0x44, 0x17, 0xc4, 0xa7, 0x7e, 0x3d, 0x64, 0x5d, 0x19, 0x73,
-            0x60, 0x81, 0x4f, 0xdc, 0x22, 0x2a, 0x90, 0x88, 0x46, 0xee, 0xb8, 0x14, 0xde, 0x5e, 0x0b, 0xdb,
-            0xe0, 0x32, 0x3a, 0x0a, 0x49, 0x06, 0x24, 0x5c, 0xc2, 0xd3, 0xac, 0x62, 0x91, 0x95, 0xe4, 0x79,
-            0xe7, 0xc8, 0x37, 0x6d, 0x8d, 0xd5, 0x4e, 0xa9, 0x6c, 0x56, 0xf4, 0xea, 0x65, 0x7a, 0xae, 0x08,
-            0xba, 0x78, 0x25, 0x2e, 0x1c, 0xa6, 0xb4, 0xc6, 0xe8, 0xdd, 0x74, 0x1f, 0x4b, 0xbd, 0x8b, 0x8a,
-            0x70, 0x3e, 0xb5, 0x66, 0x48, 0x03, 0xf6, 0x0e, 0x61, 0x35, 0x57, 0xb9, 0x86, 0xc1, 0x1d, 0x9e,
-            0xe1, 0xf8, 0x98, 0x11, 0x69, 0xd9, 0x8e, 0x94, 0x9b, 0x1e, 0x87, 0xe9, 0xce, 0x55, 0x28, 0xdf,
-            0x8c, 0xa1, 0x89, 0x0d, 0xbf, 0xe6, 0x42, 0x68, 0x41, 0x99, 0x2d, 0x0f, 0xb0, 0x54, 0xbb, 0x16
-        ]
-
-        # R-Con (Round Constants) used in Key Expansion
-        self.r_con = [
-            0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36
-        ]
-
-        self.round_keys = self.key_expansion(key)
+        # AES-128/192/256 use a 16, 24 or 32-byte key
+        if len(key) not in ROUNDS:
+            raise ValueError("Key must be 16, 24 or 32 bytes long (AES-128/192/256)")
+
+        self.s_box = S_BOX
+        self.inv_s_box = INV_S_BOX
+        self.r_con = R_CON
+        self.rounds = ROUNDS[len(key)]
+        self.key = bytes(key)
+
+        # Expanded keys come from a shared LRU cache, so building AES(key)
+        # again for a key we've seen recently skips the key expansion.
+        self.round_keys = key_schedule(bytes(key))
 
     # --- Step 1: Key Expansion ---
-    def key_expansion(self, key):
-        # AES-128 uses 4 words (columns) for the original key
-        # and generates 40 more words for 10 rounds.
+    @staticmethod
+    def key_expansion(key):
+        # The key gives Nk words (columns): 4, 6 or 8.
+        # We need 4 words for each round plus the initial one,
+        # e.g. AES-128 generates 40 more words for 10 rounds.
+        nk = len(key) // 4
+        total = 4 * (ROUNDS[len(key)] + 1)
         key_columns = [list(key[i:i+4]) for i in range(0, len(key), 4)]
         
-        i = 4
-        while i < 44: # 4 cols * (10 rounds + 1 initial) = 44 columns
+        i = nk
+        while i < total:
             temp = key_columns[i-1][:] # Copy previous word
             
-            if i % 4 == 0:
+            if i % nk == 0:
                 # Rotate word: [a,b,c,d] -> [b,c,d,a]
                 temp = temp[1:] + temp[:1]
                 # Substitute word using S-Box
-                temp = [self.s_box[b] for b in temp]
+                temp = [S_BOX[b] for b in temp]
                 # XOR with R-Con
-                temp[0] ^= self.r_con[i // 4]
+                temp[0] ^= R_CON[i // nk]
+            elif nk > 6 and i % nk == 4:
+                # AES-256 only: extra SubWord in the middle of each key block
+                temp = [S_BOX[b] for b in temp]
                 
-            # XOR with the word 4 positions back
-            prev = key_columns[i-4]
+            # XOR with the word Nk positions back
+            prev = key_columns[i-nk]
             new_word = [temp[k] ^ prev[k] for k in range(4)]
             key_columns.append(new_word)
             i += 1
@@ -81,16 +140,7 @@ class AES:
     # This is the most math-heavy part. It uses Galois Field (GF) multiplication.
     def gmul(self, a, b):
         # Galois Field multiplication of a and b in GF(2^8)
-        p = 0
-        for _ in range(8):
-            if b & 1:
-                p ^= a
-            hi_bit_set = a & 0x80
-            a = (a << 1) & 0xFF
-            if hi_bit_set:
-                a ^= 0x1b # The irreducible polynomial for AES
-            b >>= 1
-        return p
+        return gmul(a, b)
 
     def mix_columns(self, state):
         # Matrix multiplication with a fixed matrix over GF(2^8)
@@ -133,8 +183,8 @@ class AES:
         # 1. Initial AddRoundKey
         self.add_round_key(state, 0)
 
-        # 2. Main Rounds (1 to 9)
-        for round_idx in range(1, 10):
+        # 2. Main Rounds (1 to Nr-1)
+        for round_idx in range(1, self.rounds):
             self.sub_bytes(state)
             self.shift_rows(state)
             self.mix_columns(state)
@@ -143,7 +193,7 @@ class AES:
         # 3. Final Round (No MixColumns)
         self.sub_bytes(state)
         self.shift_rows(state)
-        self.add_round_key(state, 10)
+        self.add_round_key(state, self.rounds)
 
         # Convert state matrix back to bytes (column-major)
         encrypted_bytes = []
@@ -153,26 +203,434 @@ class AES:
         
         return bytes(encrypted_bytes)
 
+    # =========================================
+    # Decryption (inverse steps, applied in reverse order)
+    # =========================================
+
+    # --- InvSubBytes ---
+    # Substitute every byte in the state with one from the Inverse S-Box
+    def inv_sub_bytes(self, state):
+        for r in range(4):
+            for c in range(4):
+                state[r][c] = self.inv_s_box[state[r][c]]
+        return state
+
+    # --- InvShiftRows ---
+    # Same as ShiftRows, but rows are shifted right instead of left
+    def inv_shift_rows(self, state):
+        state[1] = state[1][-1:] + state[1][:-1]
+        state[2] = state[2][-2:] + state[2][:-2]
+        state[3] = state[3][-3:] + state[3][:-3]
+        return state
+
+    # --- InvMixColumns ---
+    # Fixed Matrix:
+    # 14 11 13  9
+    #  9 14 11 13
+    # 13  9 14 11
+    # 11 13  9 14
+    # The multiplications come from the precomputed MUL tables, not gmul.
+    def inv_mix_columns(self, state):
+        for c in range(4):
+            a0, a1, a2, a3 = [state[r][c] for r in range(4)]
+            state[0][c] = MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3]
+            state[1][c] = MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3]
+            state[2][c] = MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3]
+            state[3][c] = MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3]
+        return state
+
+    # --- Main Decryption Function ---
+    def decrypt_block(self, ciphertext):
+        if len(ciphertext) != 16:
+            raise ValueError("Input block must be exactly 16 bytes")
+
+        state = [[0] * 4 for _ in range(4)]
+        for r in range(4):
+            for c in range(4):
+                state[r][c] = ciphertext[r + 4 * c]
+
+        # 1. Undo the final round
+        self.add_round_key(state, self.rounds)
+        self.inv_shift_rows(state)
+        self.inv_sub_bytes(state)
+
+        # 2. Main Rounds, from Nr-1 down to 1
+        for round_idx in range(self.rounds - 1, 0, -1):
+            self.add_round_key(state, round_idx)
+            self.inv_mix_columns(state)
+            self.inv_shift_rows(state)
+            self.inv_sub_bytes(state)
+
+        # 3. Undo the initial AddRoundKey
+        self.add_round_key(state, 0)
+
+        decrypted_bytes = []
+        for c in range(4):
+            for r in range(4):
+                decrypted_bytes.append(state[r][c])
+
+        return bytes(decrypted_bytes)
+
+    # =========================================
+    # Batch Encryption (NumPy)
+    # =========================================
+
+    # Encrypts N independent blocks at once (ECB, or keystream blocks for
+    # CTR). Each step runs on the whole (N, 16) array:
+    # SubBytes/GF multiplies are fancy-indexed table lookups, ShiftRows is a
+    # fixed permutation of the 16 byte positions, AddRoundKey a broadcast XOR.
+    def encrypt_blocks(self, blocks):
+        import numpy as np # only needed for the batch API
+
+        s_box, mul2, mul3, shift = _numpy_tables()
+
+        if isinstance(blocks, np.ndarray):
+            if blocks.ndim != 2 or blocks.shape[1] != 16:
+                raise ValueError("Input array must have shape (N, 16)")
+            # astype would silently wrap e.g. 256 or -1 into another byte
+            if blocks.dtype != np.uint8:
+                if blocks.dtype.kind not in 'iu':
+                    raise ValueError("Input array must hold integers (bytes 0..255)")
+                if blocks.size and (blocks.min() < 0 or blocks.max() > 255):
+                    raise ValueError("Input array values must be bytes (0..255)")
+            state = blocks.astype(np.uint8) # copy, the input is left alone
+        else:
+            if len(blocks) % 16 != 0:
+                raise ValueError("Input length must be a multiple of 16 bytes")
+            state = np.frombuffer(blocks, dtype=np.uint8).reshape(-1, 16).copy()
+
+        # Round keys as a (rounds + 1, 16) array in the same byte order as a block
+        round_keys = np.array(self.round_keys, dtype=np.uint8).reshape(-1, 16)
+
+        # 1. Initial AddRoundKey
+        state ^= round_keys[0]
+
+        for round_idx in range(1, self.rounds + 1):
+            # SubBytes + ShiftRows in one gather
+            state = s_box[state[:, shift]]
+
+            # MixColumns (skipped in the final round)
+            # Bytes are column-major, so a (N, 4, 4) view is [block, col, row]
+            if round_idx != self.rounds:
+                cols = state.reshape(-1, 4, 4)
+                a0, a1, a2, a3 = cols[:, :, 0], cols[:, :, 1], cols[:, :, 2], cols[:, :, 3]
+                state = np.stack((
+                    mul2[a0] ^ mul3[a1] ^ a2 ^ a3,
+                    a0 ^ mul2[a1] ^ mul3[a2] ^ a3,
+                    a0 ^ a1 ^ mul2[a2] ^ mul3[a3],
+                    mul3[a0] ^ a1 ^ a2 ^ mul2[a3],
+                ), axis=2).reshape(-1, 16)
+
+            # AddRoundKey
+            state ^= round_keys[round_idx]
+
+        if isinstance(blocks, np.ndarray):
+            return state
+        return state.tobytes()
+
+    # =========================================
+    # CTR Mode
+    # =========================================
+
+    # Counter block = nonce followed by a big-endian block counter that
+    # starts at 0. Every block of keystream is independent, so the buffer is
+    # split into counter ranges and each range is generated by a worker
+    # process. The keystream comes back and is XORed into one preallocated
+    # output buffer. Encrypting and decrypting are the same operation.
+    # initial_counter lets a long stream be processed piece by piece, and
+    # pool lets those pieces share one ProcessPoolExecutor (it is not shut
+    # down here) instead of starting a new one per call.
+    def encrypt_ctr(self, data, nonce, workers=None, initial_counter=0, pool=None):
+        if not 0 < len(nonce) < 16:
+            raise ValueError("Nonce must be between 1 and 15 bytes long")
+
+        data = memoryview(data).cast('B') # no copy, works for bytes/bytearray/mmap
+        n_blocks = (len(data) + 15) // 16
+        if initial_counter + n_blocks > 1 << (8 * (16 - len(nonce))):
+            raise ValueError("Data is too long for this nonce size (counter would wrap)")
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        out = bytearray(len(data))
+        ranges = [(start, min(CTR_CHUNK_BLOCKS, n_blocks - start))
+                  for start in range(0, n_blocks, CTR_CHUNK_BLOCKS)]
+        args = (type(self), self.key, bytes(nonce))
+
+        # Small buffers aren't worth starting a process pool for
+        if len(ranges) <= 1 or (pool is None and workers <= 1):
+            streams = (_ctr_keystream(*args, initial_counter + start, count)
+                       for start, count in ranges)
+            self._xor_into(out, data, ranges, streams)
+            return out
+
+        # A pool passed in belongs to the caller and is left running
+        owned_pool = ProcessPoolExecutor(max_workers=workers) if pool is None else None
+        executor = pool or owned_pool
+        try:
+            streams = executor.map(_ctr_keystream, *zip(*[args + (initial_counter + start, count)
+                                                          for start, count in ranges]))
+            self._xor_into(out, data, ranges, streams)
+        finally:
+            if owned_pool is not None:
+                owned_pool.shutdown()
+
+        return out
+
+    decrypt_ctr = encrypt_ctr
+
+    @staticmethod
+    def _xor_into(out, data, ranges, streams):
+        # XOR each keystream chunk with its slice of the input (as one big
+        # integer, which is much faster than a Python loop over bytes)
+        for (start, _), stream in zip(ranges, streams):
+            lo = start * 16
+            hi = min(lo + len(stream), len(data))
+            size = hi - lo
+            chunk = int.from_bytes(data[lo:hi], 'big')
+            ks = int.from_bytes(stream[:size], 'big')
+            out[lo:hi] = (chunk ^ ks).to_bytes(size, 'big')
+
+
+# --- Key Schedule Cache ---
+# Key expansion only depends on the key bytes, so the result is cached and
+# shared (as read-only tuples) by every AES object built with the same key.
+@lru_cache(maxsize=KEY_SCHEDULE_CACHE_SIZE)
+def key_schedule(key):
+    return tuple(tuple(col) for col in AES.key_expansion(key))
+
+# =========================================
+# Table-driven Engine (T-tables)
+# =========================================
+
+def _rotr8(w):
+    return ((w >> 8) | (w << 24)) & 0xFFFFFFFF
+
+# TE0[x] is the MixColumns output column for S-Box(x) sitting in row 0:
+# (2*s, 1*s, 1*s, 3*s) packed big-endian into one 32-bit word.
+# TE1..TE3 are the same word rotated right by 8, 16 and 24 bits.
+TE0 = tuple((gmul(s, 2) << 24) | (s << 16) | (s << 8) | gmul(s, 3) for s in S_BOX)
+TE1 = tuple(_rotr8(w) for w in TE0)
+TE2 = tuple(_rotr8(w) for w in TE1)
+TE3 = tuple(_rotr8(w) for w in TE2)
+
+# TD0[x] is the InvMixColumns output column for InvS-Box(x) in row 0:
+# (14*s, 9*s, 13*s, 11*s), with TD1..TD3 rotated the same way.
+TD0 = tuple((MUL14[s] << 24) | (MUL9[s] << 16) | (MUL13[s] << 8) | MUL11[s] for s in INV_S_BOX)
+TD1 = tuple(_rotr8(w) for w in TD0)
+TD2 = tuple(_rotr8(w) for w in TD1)
+TD3 = tuple(_rotr8(w) for w in TD2)
+
+
+@lru_cache(maxsize=KEY_SCHEDULE_CACHE_SIZE)
+def table_key_schedule(key):
+    # Round keys as 32-bit words (one word per column)
+    enc = tuple(
+        (col[0] << 24) | (col[1] << 16) | (col[2] << 8) | col[3]
+        for col in key_schedule(key)
+    )
+    rounds = len(enc) // 4 - 1
+
+    # Decryption uses the "equivalent inverse cipher": the round keys are
+    # taken in reverse order and the middle ones go through InvMixColumns,
+    # so decrypt rounds have the same lookup-and-XOR shape as encrypt rounds.
+    # TDx[S_BOX[b]] is InvMixColumns applied to byte b alone.
+    dec = list(enc[rounds * 4:rounds * 4 + 4])
+    for r in range(rounds - 1, 0, -1):
+        for w in enc[r * 4:r * 4 + 4]:
+            dec.append(TD0[S_BOX[w >> 24]] ^ TD1[S_BOX[(w >> 16) & 0xFF]]
+                       ^ TD2[S_BOX[(w >> 8) & 0xFF]] ^ TD3[S_BOX[w & 0xFF]])
+    dec.extend(enc[0:4])
+
+    return enc, tuple(dec)
+
+
+# Same cipher as AES, but each round is done with 32-bit table lookups.
+# SubBytes, ShiftRows and MixColumns are folded into four tables (TE0..TE3),
+# so a round becomes 16 lookups and 16 XORs instead of calling gmul.
+class TableAES(AES):
+    def __init__(self, key):
+        super().__init__(key)
+
+        self.t0, self.t1, self.t2, self.t3 = TE0, TE1, TE2, TE3
+        self.round_words, self.dec_round_words = table_key_schedule(bytes(key))
+
+    def encrypt_block(self, plaintext):
+        if len(plaintext) != 16:
+            raise ValueError("Input block must be exactly 16 bytes")
+
+        t0, t1, t2, t3 = self.t0, self.t1, self.t2, self.t3
+        rk = self.round_words
+        s_box = self.s_box
+
+        # The state is 4 columns, each stored as a big-endian 32-bit word
+        # 1. Initial AddRoundKey
+        s0 = int.from_bytes(plaintext[0:4], 'big') ^ rk[0]
+        s1 = int.from_bytes(plaintext[4:8], 'big') ^ rk[1]
+        s2 = int.from_bytes(plaintext[8:12], 'big') ^ rk[2]
+        s3 = int.from_bytes(plaintext[12:16], 'big') ^ rk[3]
+
+        # 2. Main Rounds: SubBytes + ShiftRows + MixColumns + AddRoundKey
+        # ShiftRows is done by picking row r from column (c + r) % 4.
+        for k in range(4, self.rounds * 4, 4):
+            s0, s1, s2, s3 = (
+                t0[s0 >> 24] ^ t1[(s1 >> 16) & 0xFF] ^ t2[(s2 >> 8) & 0xFF] ^ t3[s3 & 0xFF] ^ rk[k],
+                t0[s1 >> 24] ^ t1[(s2 >> 16) & 0xFF] ^ t2[(s3 >> 8) & 0xFF] ^ t3[s0 & 0xFF] ^ rk[k + 1],
+                t0[s2 >> 24] ^ t1[(s3 >> 16) & 0xFF] ^ t2[(s0 >> 8) & 0xFF] ^ t3[s1 & 0xFF] ^ rk[k + 2],
+                t0[s3 >> 24] ^ t1[(s0 >> 16) & 0xFF] ^ t2[(s1 >> 8) & 0xFF] ^ t3[s2 & 0xFF] ^ rk[k + 3],
+            )
+
+        # 3. Final Round (No MixColumns): plain S-Box lookups
+        k = self.rounds * 4
+        out = bytearray(16)
+        for c, (a, b, d, e) in enumerate(((s0, s1, s2, s3), (s1, s2, s3, s0),
+                                          (s2, s3, s0, s1), (s3, s0, s1, s2))):
+            w = rk[k + c]
+            out[4 * c] = s_box[a >> 24] ^ (w >> 24)
+            out[4 * c + 1] = s_box[(b >> 16) & 0xFF] ^ ((w >> 16) & 0xFF)
+            out[4 * c + 2] = s_box[(d >> 8) & 0xFF] ^ ((w >> 8) & 0xFF)
+            out[4 * c + 3] = s_box[e & 0xFF] ^ (w & 0xFF)
+
+        return bytes(out)
+
+    def decrypt_block(self, ciphertext):
+        if len(ciphertext) != 16:
+            raise ValueError("Input block must be exactly 16 bytes")
+
+        t0, t1, t2, t3 = TD0, TD1, TD2, TD3
+        rk = self.dec_round_words
+        inv_s_box = self.inv_s_box
+
+        s0 = int.from_bytes(ciphertext[0:4], 'big') ^ rk[0]
+        s1 = int.from_bytes(ciphertext[4:8], 'big') ^ rk[1]
+        s2 = int.from_bytes(ciphertext[8:12], 'big') ^ rk[2]
+        s3 = int.from_bytes(ciphertext[12:16], 'big') ^ rk[3]
+
+        # InvShiftRows picks row r from column (c - r) % 4
+        for k in range(4, self.rounds * 4, 4):
+            s0, s1, s2, s3 = (
+                t0[s0 >> 24] ^ t1[(s3 >> 16) & 0xFF] ^ t2[(s2 >> 8) & 0xFF] ^ t3[s1 & 0xFF] ^ rk[k],
+                t0[s1 >> 24] ^ t1[(s0 >> 16) & 0xFF] ^ t2[(s3 >> 8) & 0xFF] ^ t3[s2 & 0xFF] ^ rk[k + 1],
+                t0[s2 >> 24] ^ t1[(s1 >> 16) & 0xFF] ^ t2[(s0 >> 8) & 0xFF] ^ t3[s3 & 0xFF] ^ rk[k + 2],
+                t0[s3 >> 24] ^ t1[(s2 >> 16) & 0xFF] ^ t2[(s1 >> 8) & 0xFF] ^ t3[s0 & 0xFF] ^ rk[k + 3],
+            )
+
+        # Final Round (No InvMixColumns): plain Inverse S-Box lookups
+        k = self.rounds * 4
+        out = bytearray(16)
+        for c, (a, b, d, e) in enumerate(((s0, s3, s2, s1), (s1, s0, s3, s2),
+                                          (s2, s1, s0, s3), (s3, s2, s1, s0))):
+            w = rk[k + c]
+            out[4 * c] = inv_s_box[a >> 24] ^ (w >> 24)
+            out[4 * c + 1] = inv_s_box[(b >> 16) & 0xFF] ^ ((w >> 16) & 0xFF)
+            out[4 * c + 2] = inv_s_box[(d >> 8) & 0xFF] ^ ((w >> 8) & 0xFF)
+            out[4 * c + 3] = inv_s_box[e & 0xFF] ^ (w & 0xFF)
+
+        return bytes(out)
+
+# =========================================
+# Padding (PKCS#7)
+# =========================================
+
+# Pads data to a multiple of the block size. The pad value is the number of
+# bytes added (1..16), so a full extra block is added when data already fits.
+def pkcs7_pad(data, block_size=16):
+    pad_len = block_size - len(data) % block_size
+    return bytes(data) + bytes([pad_len]) * pad_len
+
+def pkcs7_unpad(data, block_size=16):
+    if not data or len(data) % block_size != 0:
+        raise ValueError("Padded data must be a non-empty multiple of the block size")
+    pad_len = data[-1]
+    if not 1 <= pad_len <= block_size or data[-pad_len:] != bytes([pad_len]) * pad_len:
+        raise ValueError("Invalid PKCS#7 padding")
+    return bytes(data[:-pad_len])
+
+# =========================================
+# NumPy Tables (for AES.encrypt_blocks)
+# =========================================
+
+@lru_cache(maxsize=None)
+def _numpy_tables():
+    import numpy as np
+
+    s_box = np.array(S_BOX, dtype=np.uint8)
+    mul2 = np.array([gmul(x, 2) for x in range(256)], dtype=np.uint8)
+    mul3 = np.array([gmul(x, 3) for x in range(256)], dtype=np.uint8)
+    # ShiftRows as a permutation of byte positions (byte r + 4c):
+    # row r of column c comes from column (c + r) % 4
+    shift = np.array([r + 4 * ((c + r) % 4) for c in range(4) for r in range(4)])
+    return s_box, mul2, mul3, shift
+
+# =========================================
+# CTR Keystream Worker
+# =========================================
+
+# Number of 16-byte blocks handed to a worker at a time (64 KiB)
+CTR_CHUNK_BLOCKS = 4096
+
+def _ctr_keystream(cipher_cls, key, nonce, start, count):
+    # Runs inside the worker process. Building the cipher is cheap after the
+    # first call because the key schedule is cached per process.
+    cipher = cipher_cls(key)
+    counter_size = 16 - len(nonce)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is not None and start + count <= 1 << 64:
+        # All counter blocks as one (count, 16) array, encrypted in one batch
+        counters = (np.uint64(start) + np.arange(count, dtype=np.uint64)).astype('>u8')
+        counter_bytes = counters.view(np.uint8).reshape(-1, 8)
+        blocks = np.zeros((count, 16), dtype=np.uint8)
+        blocks[:, :len(nonce)] = np.frombuffer(nonce, dtype=np.uint8)
+        width = min(8, counter_size)
+        blocks[:, 16 - width:] = counter_bytes[:, 8 - width:]
+        return cipher.encrypt_blocks(blocks).tobytes()
+
+    stream = bytearray(16 * count)
+    for i in range(count):
+        block = nonce + (start + i).to_bytes(counter_size, 'big')
+        stream[16 * i:16 * i + 16] = cipher.encrypt_block(block)
+    return bytes(stream)
+
 # =========================================
 # Usage Example
 # =========================================
 
-# 1. Define a 16-byte Key (128 bits)
-key = b'Thats my Kung Fu' # Exactly 16 chars
+if __name__ == '__main__':
+    # 1. Define a 16-byte Key (128 bits)
+    key = b'Thats my Kung Fu' # Exactly 16 chars
+
+    # 2. Initialize AES with the key
+    aes = AES(key)
+
+    # 3. Define a 16-byte block to encrypt
+    # (For longer messages, use pkcs7_pad and a mode such as CBC or CTR,
+    #  see aes_stream.py)
+    plaintext = b'Two One Nine Two'
+
+    print(f"Plaintext: {plaintext}")
+    print(f"Key:       {key}")
 
-# 2. Initialize AES with the key
-aes = AES(key)
+    # 4. Encrypt
+    ciphertext = aes.encrypt_block(plaintext)
+    print(f"Encrypted: {ciphertext.hex()}")
 
-# 3. Define a 16-byte block to encrypt
-# (In real life, you need Padding if the message isn't exactly 16 bytes)
-plaintext = b'Two One Nine Two'
+    # Expected output for this specific Key/Plaintext combination (Standard Test Vector):
+    # Encrypted: 29c3505f571420f6402299b31a02d73a
 
-print(f"Plaintext: {plaintext}")
-print(f"Key:       {key}")
+    # 5. Same block through the table-driven engine (must match)
+    fast_aes = TableAES(key)
+    print(f"T-tables:  {fast_aes.encrypt_block(plaintext).hex()}")
 
-# 4. Encrypt
-ciphertext = aes.encrypt_block(plaintext)
-print(f"Encrypted: {ciphertext.hex()}")
+    # 6. Decrypt back to the original block
+    print(f"Decrypted: {aes.decrypt_block(ciphertext)}")
 
-# Expected output for this specific Key/Plaintext combination (Standard Test Vector):
-# Encrypted: 29c3505f571420f6402299b31a02d73a
\ No newline at end of file
+    # 7. CTR mode over a longer message (any length, no padding needed)
+    message = b'CTR mode turns AES into a stream cipher, so any length works.'
+    nonce = b'\x00' * 8
+    ctr_ciphertext = fast_aes.encrypt_ctr(message, nonce, workers=1)
+    print(f"CTR:       {bytes(ctr_ciphertext).hex()}")
+    print(f"CTR back:  {bytes(fast_aes.decrypt_ctr(ctr_ciphertext, nonce, workers=1))}")
@@ -0,0 +1,288 @@
+import argparse
+import mmap
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from AES_en import TableAES, pkcs7_pad, pkcs7_unpad
+
+# Bytes read from the input at a time. Must be a multiple of 16.
+# Memory use stays around a few chunks no matter how big the file is.
+CHUNK_SIZE = 1024 * 1024
+
+# Size of the header written in front of the ciphertext
+IV_SIZE = 16     # CBC: random IV
+NONCE_SIZE = 8   # CTR: random nonce, the other 8 bytes are the block counter
+
+MODES = ('cbc', 'ctr')
+
+
+def _read_chunks(f, chunk_size):
+    # Regular files are memory-mapped and sliced one chunk at a time, so only
+    # the current chunk is ever copied out of the page cache. Pipes, sockets
+    # and empty files can't be mapped, so we fall back to fixed-size reads.
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, AttributeError):
+        mm = None
+
+    if mm is None:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        with mm:
+            for pos in range(f.tell(), len(mm), chunk_size):
+                yield mm[pos:pos + chunk_size]
+
+
+def _read_exact(f, size):
+    # Keeps reading, a single read() may return fewer bytes than asked for
+    data = b''
+    while len(data) < size:
+        part = f.read(size - len(data))
+        if not part:
+            break
+        data += part
+    if len(data) != size:
+        raise ValueError("Input is too short to contain the IV/nonce header")
+    return data
+
+
+def _counted(chunks, total):
+    # Passes the chunks through and adds their sizes to total[0]
+    for chunk in chunks:
+        total[0] += len(chunk)
+        yield chunk
+
+
+@contextmanager
+def _replacing(path):
+    # Writes go to a temporary file next to path, which replaces path only
+    # once the block finishes. On any error it is removed, so an existing
+    # file is never truncated or left half-written.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dst:
+            yield dst
+        try:
+            # mkstemp creates the file as 0600: keep the mode of the file we replace
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _xor16(a, b):
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(16, 'big')
+
+
+# --- CBC ---
+# Each block is XORed with the previous ciphertext block before encryption,
+# so encryption is sequential. Leftover bytes (less than one block) are
+# carried over to the next chunk and padded at the very end.
+def _cbc_encrypt_stream(cipher, chunks, iv, write):
+    prev = iv
+    carry = b''
+    for chunk in chunks:
+        data = carry + bytes(chunk)
+        full = len(data) - len(data) % 16
+        out = bytearray(full)
+        for i in range(0, full, 16):
+            prev = cipher.encrypt_block(_xor16(data[i:i + 16], prev))
+            out[i:i + 16] = prev
+        write(out)
+        carry = data[full:]
+
+    last = pkcs7_pad(carry)
+    for i in range(0, len(last), 16):
+        prev = cipher.encrypt_block(_xor16(last[i:i + 16], prev))
+        write(prev)
+
+
+# The last block holds the padding, so it is held back until the input ends.
+def _cbc_decrypt_stream(cipher, chunks, iv, write):
+    prev = iv
+    carry = b''
+    for chunk in chunks:
+        data = carry + bytes(chunk)
+        # Keep at least one full block (the possible padding block) back
+        full = len(data) - len(data) % 16
+        if full == len(data):
+            full -= 16
+        out = bytearray(max(full, 0))
+        for i in range(0, full, 16):
+            block = data[i:i + 16]
+            out[i:i + 16] = _xor16(cipher.decrypt_block(block), prev)
+            prev = block
+        write(out)
+        carry = data[max(full, 0):]
+
+    if len(carry) != 16:
+        raise ValueError("Ciphertext length is not a multiple of the block size")
+    write(pkcs7_unpad(_xor16(cipher.decrypt_block(carry), prev)))
+
+
+# --- CTR ---
+# No padding: the keystream is just cut to the input length. Reads can come
+# back short (pipes, sockets, raw files), so only whole blocks are processed
+# per chunk and the leftover bytes are carried over, which keeps the block
+# counter in step with the data. The partial last block is done at the end.
+# With workers > 1, one process pool is shared by all chunks of the stream.
+def _ctr_stream(cipher, chunks, nonce, write, workers):
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        counter = 0
+        carry = b''
+        for chunk in chunks:
+            data = carry + bytes(chunk) if carry else chunk
+            full = len(data) // 16 * 16
+            if full:
+                write(cipher.encrypt_ctr(memoryview(data)[:full], nonce, workers=workers,
+                                         initial_counter=counter, pool=pool))
+                counter += full // 16
+            carry = bytes(data[full:])
+        if carry:
+            write(cipher.encrypt_ctr(carry, nonce, workers=1, initial_counter=counter))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def encrypt_stream(src, dst, key, mode='cbc', chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Encrypts everything read from src and writes it to dst.
+
+    Args:
+        src: Binary file-like object to read the plaintext from.
+        dst: Binary file-like object the IV/nonce and ciphertext are written to.
+        key (bytes): 16, 24 or 32-byte AES key.
+        mode (str): 'cbc' (PKCS#7 padded) or 'ctr'.
+        chunk_size (int): Bytes processed at a time (multiple of 16).
+        workers (int): Worker processes for CTR keystream generation.
+
+    Returns:
+        int: Number of plaintext bytes processed.
+    """
+    if mode not in MODES:
+        raise ValueError("Mode must be 'cbc' or 'ctr'.")
+    if chunk_size <= 0 or chunk_size % 16 != 0:
+        raise ValueError("Chunk size must be a positive multiple of 16")
+
+    cipher = TableAES(key)
+    total = [0]
+    chunks = _counted(_read_chunks(src, chunk_size), total)
+    if mode == 'cbc':
+        iv = os.urandom(IV_SIZE)
+        dst.write(iv)
+        _cbc_encrypt_stream(cipher, chunks, iv, dst.write)
+    else:
+        nonce = os.urandom(NONCE_SIZE)
+        dst.write(nonce)
+        _ctr_stream(cipher, chunks, nonce, dst.write, workers)
+    return total[0]
+
+
+def decrypt_stream(src, dst, key, mode='cbc', chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Decrypts data written by encrypt_stream from src into dst.
+
+    Args:
+        src: Binary file-like object holding the IV/nonce and ciphertext.
+        dst: Binary file-like object the plaintext is written to.
+        key (bytes): The key used for encryption.
+        mode (str): 'cbc' or 'ctr', same as for encryption.
+        chunk_size (int): Bytes processed at a time (multiple of 16).
+        workers (int): Worker processes for CTR keystream generation.
+
+    Returns:
+        int: Number of ciphertext bytes processed (without the header).
+    """
+    if mode not in MODES:
+        raise ValueError("Mode must be 'cbc' or 'ctr'.")
+    if chunk_size <= 0 or chunk_size % 16 != 0:
+        raise ValueError("Chunk size must be a positive multiple of 16")
+
+    cipher = TableAES(key)
+    total = [0]
+    if mode == 'cbc':
+        iv = _read_exact(src, IV_SIZE)
+        _cbc_decrypt_stream(cipher, _counted(_read_chunks(src, chunk_size), total), iv, dst.write)
+    else:
+        nonce = _read_exact(src, NONCE_SIZE)
+        _ctr_stream(cipher, _counted(_read_chunks(src, chunk_size), total), nonce, dst.write, workers)
+    return total[0]
+
+
+def encrypt_file(src_path, dst_path, key, mode='cbc', **kwargs):
+    with open(src_path, 'rb') as src, _replacing(dst_path) as dst:
+        return encrypt_stream(src, dst, key, mode, **kwargs)
+
+
+def decrypt_file(src_path, dst_path, key, mode='cbc', **kwargs):
+    with open(src_path, 'rb') as src, _replacing(dst_path) as dst:
+        return decrypt_stream(src, dst, key, mode, **kwargs)
+
+
+# =========================================
+# Command Line
+# =========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt files with AES (CBC or CTR).")
+    parser.add_argument('action', choices=['encrypt', 'decrypt'])
+    parser.add_argument('input', help="input file, or - for stdin")
+    parser.add_argument('output', help="output file, or - for stdout")
+    parser.add_argument('--key', required=True, help="key as hex (32, 48 or 64 hex digits)")
+    parser.add_argument('--mode', choices=MODES, default='cbc')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for CTR keystream generation")
+    args = parser.parse_args(argv)
+
+    # Everything that can be checked up front is, before any file is touched
+    try:
+        key = bytes.fromhex(args.key)
+        TableAES(key)
+    except ValueError as e:
+        parser.error(f"--key: {e}")
+    if args.chunk_size <= 0 or args.chunk_size % 16 != 0:
+        parser.error("--chunk-size must be a positive multiple of 16")
+    run = encrypt_stream if args.action == 'encrypt' else decrypt_stream
+
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            if args.input == '-':
+                src = sys.stdin.buffer
+            else:
+                src = stack.enter_context(open(args.input, 'rb'))
+            if args.output == '-':
+                dst = sys.stdout.buffer
+            else:
+                # The output only replaces the file once everything succeeded
+                dst = stack.enter_context(_replacing(args.output))
+            processed = run(src, dst, key, args.mode, chunk_size=args.chunk_size, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    # Throughput goes to stderr so it never ends up mixed into piped output
+    rate = processed / elapsed / 1e6 if elapsed > 0 else float('inf')
+    print(f"{args.action}ed {processed} bytes in {elapsed:.3f}s ({rate:.2f} MB/s, {args.mode.upper()})",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""
+Benchmarks for every cipher, with regression tracking.
+
+Each primitive is timed at input sizes from 16 B up to --max-size (100 MB
+at most) and reported in MB/s and calls per second. One-off setup costs
+(key expansion, key tables, matrix inverses) are timed separately.
+
+Before anything is timed, every cipher is checked against known vectors
+(FIPS-197 for AES, textbook examples for the others) and round trips, so
+a fast but wrong change can't pass.
+
+    python benchmark.py --output results.json
+    python benchmark.py --baseline bench_baseline.json --save-baseline
+    python benchmark.py --baseline bench_baseline.json   # exit 1 on regression
+
+Exit codes: 0 ok, 1 throughput regression, 2 failed correctness check.
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+import ciphers
+
+# Input sizes (bytes / characters per call)
+SIZES = (16, 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 100 * 1024 * 1024)
+
+# A benchmark is repeated until it has run for at least this long (seconds)
+MIN_TIME = 0.2
+
+# A result this much slower than the baseline (0.25 = 25%) is a regression
+THRESHOLD = 0.25
+
+# Text inputs are made of these characters (letters, some case, spaces)
+_TEXT_ALPHABET = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJ     '
+
+
+# --- Inputs ---
+
+def parse_size(value):
+    """'16', '64K', '1M', '100M' -> number of bytes."""
+    units = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 ** 3}
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def format_size(size):
+    for unit, scale in (('M', 1024 * 1024), ('K', 1024)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return str(size)
+
+
+def make_text(size, seed=0):
+    # Random bytes mapped onto _TEXT_ALPHABET (fast even for 100 MB)
+    table = bytes(_TEXT_ALPHABET[b % len(_TEXT_ALPHABET)] for b in range(256))
+    return random.Random(seed).randbytes(size).translate(table).decode('ascii')
+
+
+def make_bytes(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+# --- Correctness ---
+
+class _ShortReader(io.RawIOBase):
+    # Returns at most `step` bytes per read, like a pipe or socket can
+    def __init__(self, data, step=7):
+        self.data = data
+        self.pos = 0
+        self.step = step
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(self.step, len(buffer), len(self.data) - self.pos)
+        buffer[:size] = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+
+def check_vectors(rsa_keys):
+    """
+    Known answers and round trips for every cipher.
+
+    Returns:
+        dict: check name -> True/False.
+    """
+    aes, caesar, vigenere = ciphers.aes, ciphers.caesar, ciphers.vigenere
+    playfair, hill, rsa = ciphers.playfair, ciphers.hill, ciphers.rsa
+    checks = {}
+
+    # FIPS-197 Appendix C (AES-128/192/256) and A.1 (key expansion)
+    plaintext = bytes.fromhex('00112233445566778899aabbccddeeff')
+    for key_hex, expected in (
+            ('000102030405060708090a0b0c0d0e0f', '69c4e0d86a7b0430d8cdb78070b4c55a'),
+            ('000102030405060708090a0b0c0d0e0f1011121314151617', 'dda97ca4864cdfe06eaf70a0ec0d7191'),
+            ('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+             '8ea2b7ca516745bfeafc49904b496089')):
+        key = bytes.fromhex(key_hex)
+        bits = len(key) * 8
+        for cls in (aes.AES, aes.TableAES):
+            cipher = cls(key)
+            ciphertext = bytes(cipher.encrypt_block(plaintext))
+            checks[f"{cls.__name__}-{bits} FIPS-197"] = (
+                ciphertext.hex() == expected and bytes(cipher.decrypt_block(ciphertext)) == plaintext)
+    aes_key_128 = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+    expanded = aes.AES.key_expansion(bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c'))
+    checks["AES key_expansion FIPS-197 A.1"] = bytes(expanded[-1]).hex() == 'b6630ca6'
+    # The vector from the AES_en.py example
+    checks["AES example vector"] = (bytes(aes.AES(b'Thats my Kung Fu').encrypt_block(b'Two One Nine Two')).hex()
+                                    == '29c3505f571420f6402299b31a02d73a')
+
+    # Streams must survive short, unaligned reads
+    message = make_bytes(200)
+    for mode in ('ctr', 'cbc'):
+        stream = ciphers.aes_stream
+        encrypted, decrypted = io.BytesIO(), io.BytesIO()
+        try:
+            stream.encrypt_stream(_ShortReader(message), encrypted, aes_key_128, mode)
+            stream.decrypt_stream(_ShortReader(encrypted.getvalue()), decrypted, aes_key_128, mode)
+        except ValueError:
+            pass
+        checks[f"aes_stream {mode.upper()} short reads"] = decrypted.getvalue() == message
+
+    checks["caesar"] = caesar.caesar_cipher("Hello, World!", 3, 'encrypt') == "Khoor, Zruog!"
+    checks["vigenere"] = vigenere.vigenere_cipher("ATTACKATDAWN", "LEMON", 'encrypt') == "LXFOPVEFRNHR"
+    long_text = make_text(vigenere.VECTORIZE_THRESHOLD * 2, seed=1)
+    checks["vigenere vectorized round trip"] = vigenere.vigenere_cipher(
+        vigenere.vigenere_cipher(long_text, "LEMON", 'encrypt'), "LEMON", 'decrypt') == long_text
+    # A lone surrogate (valid str, e.g. from errors='surrogateescape') in a
+    # text long enough for the NumPy engine. The piece has 5 letters, one
+    # per key letter, so the loop result for one piece repeats.
+    piece = "ab\udcffé, de "
+    repeats = vigenere.VECTORIZE_THRESHOLD // len(piece) + 1
+    try:
+        checks["vigenere vectorized lone surrogate"] = vigenere.vigenere_cipher(
+            piece * repeats, "LEMON", 'encrypt') == vigenere.vigenere_cipher(piece, "LEMON", 'encrypt') * repeats
+    except UnicodeError:
+        checks["vigenere vectorized lone surrogate"] = False
+    # Letters outside a-z (here 'é') still move the key forward, so the
+    # analysis has to count them to keep the key columns aligned
+    english = ciphers.playfair_solver.DEFAULT_CORPUS[:1500]
+    message = list(vigenere.vigenere_cipher(english, "DICKENS", 'encrypt'))
+    for i in [i for i, c in enumerate(message) if c.isalpha()][5::17]:
+        message[i] = 'é'
+    cracked = ciphers.vigenere_analysis.crack_vigenere(''.join(message))
+    checks["vigenere analysis non-ASCII letters"] = bool(cracked) and cracked[0][0] == "DICKENS"
+
+    table, _ = playfair.generate_key_table("PLAYFAIR EXAMPLE")
+    checks["playfair key table"] = ''.join(table[0]) == 'PLAYF' and ''.join(table[1]) == 'IREXM'
+    checks["playfair"] = (playfair.playfair_cipher("Hide the gold in the tree stump", "PLAYFAIR EXAMPLE", 'encrypt')
+                          == "BMODZBXDNABEKUDMUIXMMOUVIF")
+
+    key_matrix = hill.create_key_matrix("GYBNQKURP", 3)
+    checks["hill"] = hill.hill_cipher("ACT", key_matrix, 'encrypt') == "POH"
+    checks["hill matrix_mod_inverse"] = (hill.matrix_mod_inverse(key_matrix, 26).tolist()
+                                         == [[8, 5, 10], [21, 8, 21], [21, 12, 8]])
+    checks["hill round trip"] = hill.hill_cipher(
+        hill.hill_cipher("ACTNOW", key_matrix, 'encrypt'), key_matrix, 'decrypt') == "ACTNOW"
+
+    # Textbook RSA: p=61, q=53, e=17, d=2753, m=65 -> c=2790
+    checks["rsa textbook"] = (rsa.encrypt((17, 3233), "A") == [2790]
+                              and rsa.decrypt(rsa.RSAPrivateKey(2753, 3233, 61, 53), [2790]) == "A")
+    public, private = rsa_keys
+    checks["rsa round trip"] = rsa.decrypt(private, rsa.encrypt(public, "Round trip!")) == "Round trip!"
+    return checks
+
+
+# --- Timing ---
+
+def measure(func, min_time=MIN_TIME):
+    """
+    Seconds per call: the best of a few runs, each run repeating func until
+    it has taken at least min_time / 3.
+    """
+    best = float('inf')
+    deadline = time.perf_counter() + min_time
+    while True:
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time / 3:
+                break
+        best = min(best, elapsed / calls)
+        if time.perf_counter() >= deadline:
+            return best
+
+
+def throughput_benchmarks(rsa_keys):
+    """
+    Name -> (largest size, setup(size) -> zero-argument callable).
+
+    Pure-Python per-block/per-character primitives stop at a smaller size;
+    at 100 MB a single call would take hours.
+    """
+    aes, caesar, vigenere = ciphers.aes, ciphers.caesar, ciphers.vigenere
+    playfair, hill, rsa = ciphers.playfair, ciphers.hill, ciphers.rsa
+    public, private = rsa_keys
+    aes_key = b'Thats my Kung Fu'
+    hill_key = hill.create_key_matrix("GYBNQKURP", 3)
+
+    def blocks(cipher_cls):
+        def setup(size):
+            cipher = cipher_cls(aes_key)
+            data = make_bytes(max(16, size // 16 * 16))
+            chunks = [data[i:i + 16] for i in range(0, len(data), 16)]
+            return lambda: [cipher.encrypt_block(block) for block in chunks]
+        return setup
+
+    def rsa_decrypt(size):
+        ciphertext = rsa.encrypt(public, make_text(size))
+        return lambda: rsa.decrypt(private, ciphertext)
+
+    return {
+        'caesar_cipher': (SIZES[-1], lambda size: (
+            lambda text=make_text(size): caesar.caesar_cipher(text, 3, 'encrypt'))),
+        'vigenere_cipher': (SIZES[-1], lambda size: (
+            lambda text=make_text(size): vigenere.vigenere_cipher(text, "LEMON", 'encrypt'))),
+        'playfair_cipher': (16 * 1024 * 1024, lambda size: (
+            lambda text=make_text(size): playfair.playfair_cipher(text, "PLAYFAIR EXAMPLE", 'encrypt'))),
+        'hill_cipher': (SIZES[-1], lambda size: (
+            lambda text=make_text(size): hill.hill_cipher(text, hill_key, 'encrypt'))),
+        'AES.encrypt_block': (1024 * 1024, blocks(aes.AES)),
+        'TableAES.encrypt_block': (1024 * 1024, blocks(aes.TableAES)),
+        'rsa.encrypt': (64 * 1024, lambda size: (
+            lambda text=make_text(size): rsa.encrypt(public, text))),
+        'rsa.decrypt': (1024, rsa_decrypt),
+    }
+
+
+def setup_benchmarks():
+    """Name -> zero-argument callable for one-off setup costs."""
+    import numpy as np # only for the random 20x20 matrix
+
+    aes, playfair, hill = ciphers.aes, ciphers.playfair, ciphers.hill
+    key_3x3 = hill.create_key_matrix("GYBNQKURP", 3)
+    key_big = np.random.default_rng(0).integers(0, 29, (20, 20))
+
+    def inverse(matrix, modulus):
+        # matrix_mod_inverse caches results, time the real work
+        def run():
+            hill._cached_mod_inverse.cache_clear()
+            try:
+                hill.matrix_mod_inverse(matrix, modulus)
+            except ValueError:
+                pass
+        return run
+
+    return {
+        'AES.key_expansion (128)': lambda: aes.AES.key_expansion(b'Thats my Kung Fu'),
+        'AES.key_expansion (256)': lambda: aes.AES.key_expansion(bytes(range(32))),
+        'generate_key_table': lambda: playfair.generate_key_table("PLAYFAIR EXAMPLE"),
+        'matrix_mod_inverse (3x3 mod 26)': inverse(key_3x3, 26),
+        'matrix_mod_inverse (20x20 mod 29)': inverse(key_big, 29),
+    }
+
+
+def run(max_size, only=None, min_time=MIN_TIME, rsa_bits=2048, log=print):
+    """
+    Runs the checks and all benchmarks.
+
+    Returns:
+        dict: JSON-ready results ('checks', 'results', 'meta').
+    """
+    started = time.perf_counter()
+    public, private = ciphers.rsa.generate_keypair(bits=rsa_bits)
+    log(f"RSA-{rsa_bits} key generated in {time.perf_counter() - started:.2f}s")
+
+    checks = check_vectors((public, private))
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'max_size': max_size,
+            'rsa_bits': rsa_bits,
+        },
+        'checks': checks,
+        'results': {},
+    }
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        log("FAILED checks: " + ", ".join(failed))
+        return report
+
+    for name, func in setup_benchmarks().items():
+        if only and not any(o in name for o in only):
+            continue
+        seconds = measure(func, min_time)
+        report['results'][f"setup/{name}"] = {'seconds': seconds, 'ops_per_s': 1 / seconds}
+        log(f"{'setup/' + name:<44} {seconds * 1e6:12.1f} us   {1 / seconds:12.1f} ops/s")
+
+    for name, (limit, setup) in throughput_benchmarks((public, private)).items():
+        if only and not any(o in name for o in only):
+            continue
+        for size in SIZES:
+            if size > min(max_size, limit):
+                break
+            seconds = measure(setup(size), min_time)
+            key = f"{name}@{format_size(size)}"
+            report['results'][key] = {
+                'size': size,
+                'seconds': seconds,
+                'mb_per_s': size / seconds / 1e6,
+                'ops_per_s': 1 / seconds,
+            }
+            log(f"{key:<44} {size / seconds / 1e6:12.3f} MB/s {1 / seconds:12.1f} ops/s")
+    return report
+
+
+# --- Baseline ---
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Results that got slower than the baseline by more than threshold.
+
+    Returns:
+        list: (name, baseline value, current value, change) tuples.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        metric = 'mb_per_s' if 'mb_per_s' in current else 'ops_per_s'
+        if current[metric] < previous[metric] * (1 - threshold):
+            change = current[metric] / previous[metric] - 1
+            regressions.append((name, previous[metric], current[metric], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every cipher and compare against a baseline.")
+    parser.add_argument('--max-size', default='1M', help="largest input size, e.g. 64K, 1M, 100M (default: 1M)")
+    parser.add_argument('--only', help="comma-separated substrings of the benchmark names to run")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="seconds spent on each measurement")
+    parser.add_argument('--rsa-bits', type=int, default=2048)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON file to compare against (written by --save-baseline)")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed slowdown before it counts as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    only = [o.strip() for o in args.only.split(',')] if args.only else None
+    report = run(parse_size(args.max_size), only, args.min_time, args.rsa_bits)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if not all(report['checks'].values()):
+        return 2
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.threshold)
+        for name, previous, current, change in regressions:
+            print(f"REGRESSION {name}: {previous:.3f} -> {current:.3f} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
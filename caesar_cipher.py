@@ -1,47 +1,133 @@
+# The alphabet we will use for shifting
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+# Characters are read this many at a time by caesar_stream
+CHUNK_SIZE = 1024 * 1024
+
+def _build_tables(shift):
+    shifted = ALPHABET[shift:] + ALPHABET[:shift]
+    # str table: lowercase and uppercase letters, case is kept.
+    # The Kelvin sign lowercases to 'k', so it's shifted like an uppercase K.
+    str_table = str.maketrans(ALPHABET + ALPHABET.upper() + '\u212a',
+                              shifted + shifted.upper() + shifted[10].upper())
+    # bytes table: the same mapping for ASCII letters, other bytes unchanged
+    bytes_table = bytes.maketrans((ALPHABET + ALPHABET.upper()).encode(),
+                                  (shifted + shifted.upper()).encode())
+    return str_table, bytes_table
+
+# Translation tables for all 26 shifts, built once at import
+STR_TABLES, BYTES_TABLES = zip(*[_build_tables(shift) for shift in range(26)])
+
 def caesar_cipher(text, shift, mode):
-   
-    # The alphabet we will use for shifting
-    alphabet = 'abcdefghijklmnopqrstuvwxyz'
-    result = ''
+    # Works on str (str.translate) or on bytes-like data (bytes.translate).
+    # Non-letters are kept as they are and the original case is maintained.
 
     shift = shift % 26
 
     # For decryption, we reverse the shift
     if mode == 'decrypt':
-        shift = -shift
-
-    for char in text:
-        # Check if the character is an alphabet letter
-        if char.lower() in alphabet:
-
-            position = alphabet.find(char.lower())
-            
-            new_position = (position + shift) % 26
-            
-            new_char = alphabet[new_position]
-            
-            # Maintain the original case (uppercase or lowercase)
-            if char.isupper():
-                result += new_char.upper()
-            else:
-                result += new_char
-        else:
-            # If the character is not a letter, keep it as is
-            result += char
-            
-    return result
+        shift = -shift % 26
+
+    if isinstance(text, (bytes, bytearray)):
+        return text.translate(BYTES_TABLES[shift])
+    if isinstance(text, memoryview):
+        return bytes(text).translate(BYTES_TABLES[shift])
+    return text.translate(STR_TABLES[shift])
+
+def caesar_stream(src, dst, shift, mode, chunk_size=CHUNK_SIZE):
+    # Reads a file-like object (text or binary) chunk by chunk and writes the
+    # result to dst, so memory use doesn't grow with the input size.
+    # Letters map one-to-one, so chunk boundaries don't matter.
+    total = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            return total
+        dst.write(caesar_cipher(chunk, shift, mode))
+        total += len(chunk)
+
+# --- Cracking (unknown shift) ---
+
+# English letter frequencies (a-z), in percent
+ENGLISH_FREQUENCIES = (
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+)
+
+def _as_ascii(text):
+    if isinstance(text, str):
+        return text.encode('ascii', 'ignore')
+    return bytes(text)
+
+def crack_caesar_batch(ciphertexts):
+    """
+    Finds the most likely shift for many ciphertexts at once.
+
+    One letter histogram is built per ciphertext (a single bincount over all
+    of them), and all 26 rotations are scored against English with the
+    chi-squared statistic. Since sum((o - e)^2 / e) = sum(o^2 / e) - N, the
+    scores for every rotation of every ciphertext come from one matrix product.
+
+    Returns:
+        tuple: (best_shifts, scores) as NumPy arrays. scores has shape
+        (len(ciphertexts), 26), lower is better, and scores[i, s] is the score
+        for shift s. Ciphertexts without letters score inf.
+    """
+    import numpy as np # only needed for cracking
+
+    encoded = [_as_ascii(text) for text in ciphertexts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    segment = np.repeat(np.arange(len(encoded)), lengths)
+
+    # Fold case (set bit 0x20) and keep only a-z (uint8 wraps, so anything
+    # below 'a' ends up >= 26 too)
+    letters = (data | 0x20) - ord('a')
+    is_letter = letters < 26
+    counts = np.bincount(segment[is_letter] * 26 + letters[is_letter],
+                         minlength=len(encoded) * 26).reshape(-1, 26).astype(np.float64)
+    totals = counts.sum(axis=1)
+
+    # weights[i, s] = 1 / freq(letter i decrypted with shift s)
+    freq = np.array(ENGLISH_FREQUENCIES)
+    freq /= freq.sum()
+    i, s = np.indices((26, 26))
+    weights = 1 / freq[(i - s) % 26]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (counts ** 2) @ weights / totals[:, None] - totals[:, None]
+    scores[totals == 0] = np.inf
+
+    return scores.argmin(axis=1), scores
+
+def crack_caesar(ciphertext):
+    """
+    Ranks all 26 shifts for one ciphertext.
+
+    Returns:
+        list: (shift, score) pairs, best (lowest chi-squared) first.
+        caesar_cipher(ciphertext, shift, 'decrypt') gives the plaintext.
+    """
+    _, scores = crack_caesar_batch([ciphertext])
+    order = scores[0].argsort(kind='stable')
+    return [(int(shift), float(scores[0][shift])) for shift in order]
 
 # --- Example Usage ---
 
-# 1. Define the message and the key (shift)
-original_message = "Hello, World! This is a secret message."
-cipher_key = 7
+if __name__ == '__main__':
+    # 1. Define the message and the key (shift)
+    original_message = "Hello, World! This is a secret message."
+    cipher_key = 7
+
+    # 2. Encrypt the message
+    encrypted_message = caesar_cipher(original_message, cipher_key, 'encrypt')
+    print(f"Original Message:  {original_message}")
+    print(f"Encrypted Message: {encrypted_message}")
 
-# 2. Encrypt the message
-encrypted_message = caesar_cipher(original_message, cipher_key, 'encrypt')
-print(f"Original Message:  {original_message}")
-print(f"Encrypted Message: {encrypted_message}")
+    # 3. Decrypt the message
+    decrypted_message = caesar_cipher(encrypted_message, cipher_key, 'decrypt')
+    print(f"Decrypted Message: {decrypted_message}")
 
-# 3. Decrypt the message
-decrypted_message = caesar_cipher(encrypted_message, cipher_key, 'decrypt')
-print(f"Decrypted Message: {decrypted_message}")
+    # 4. Recover the shift without knowing the key
+    best_shift, score = crack_caesar(encrypted_message)[0]
+    print(f"Cracked Shift:     {best_shift} (chi-squared {score:.1f})")
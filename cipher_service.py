@@ -0,0 +1,511 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import ciphers
+
+# --- Protocol ---
+# Every message (request or response) is one frame:
+#
+#   4 bytes  header length (big-endian)
+#   4 bytes  payload length (big-endian)
+#   header   JSON object
+#   payload  raw bytes
+#
+# Request header:  {"id": 1, "op": "aes", "mode": "encrypt", "key": "..."}
+# Response header: {"id": 1, "ok": true} or {"id": 1, "ok": false, "error": "..."}
+#
+# Keys and payloads per operation:
+#   aes       key: hex string               payload: n * 16 bytes (each block on its own)
+#   vigenere  key: keyword                  payload: UTF-8 text
+#   playfair  key: keyword                  payload: UTF-8 text
+#   hill      key: n*n letters              payload: UTF-8 text
+#   rsa       key: [e, n] / [d, n] or [d, n, p, q] for CRT
+#             payload: UTF-8 text to encrypt, or a JSON list of numbers to decrypt
+#             (the result is the other one)
+#   stats     no key, returns the server statistics as JSON
+
+FRAME_HEADER = struct.Struct('>II')
+
+# Frames larger than this, or whose header is not a JSON object, get an
+# error reply and the connection is closed
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+DEFAULT_PORT = 8765
+
+# Requests waiting for (or being processed by) a worker. When the limit is
+# reached, the server stops reading from its sockets until work finishes.
+MAX_IN_FLIGHT = 1024
+
+# Requests with the same operation, mode and key that arrive within
+# BATCH_DELAY seconds are sent to a worker as one batch (up to BATCH_SIZE)
+BATCH_SIZE = 64
+BATCH_DELAY = 0.002
+
+# Prepared keys (expanded AES keys, Playfair maps, Hill matrices) kept per worker
+WORKER_CACHE_SIZE = 256
+
+# Latencies kept for the p50/p99 figures
+LATENCY_SAMPLES = 100000
+
+MODES = ('encrypt', 'decrypt')
+
+
+async def read_frame(reader):
+    """Reads one frame. Returns (header dict, payload bytes)."""
+    header_size, payload_size = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if header_size + payload_size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {header_size + payload_size} bytes is larger than {MAX_FRAME_SIZE}")
+    raw_header = await reader.readexactly(header_size)
+    payload = await reader.readexactly(payload_size)
+    try:
+        header = json.loads(raw_header)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict):
+        raise ValueError("Frame header must be a JSON object")
+    return header, payload
+
+
+def write_frame(writer, header, payload=b''):
+    header = json.dumps(header, separators=(',', ':')).encode()
+    writer.write(FRAME_HEADER.pack(len(header), len(payload)) + header + payload)
+
+
+# =========================================
+# Worker side (runs in the process pool)
+# =========================================
+
+def _freeze(key):
+    # JSON lists -> tuples, so keys can be cached and grouped
+    return tuple(_freeze(k) for k in key) if isinstance(key, list) else key
+
+
+@lru_cache(maxsize=WORKER_CACHE_SIZE)
+def _prepared_key(op, mode, key):
+    # Everything that only depends on the key is done once per worker
+    if op == 'aes':
+        return ciphers.TableAES(bytes.fromhex(key))
+    if op == 'vigenere':
+        return key
+    if op == 'playfair':
+        return ciphers.playfair.compile_key(key)
+    if op == 'hill':
+        n = math.isqrt(len(key))
+        matrix = ciphers.create_key_matrix(key, n)
+        if mode == 'decrypt':
+            ciphers.matrix_mod_inverse(matrix, 26) # fills hill_cipheer's inverse cache
+        return matrix
+    if op == 'rsa':
+        if mode == 'decrypt' and len(key) == 4:
+            return ciphers.RSAPrivateKey(*key)
+        return tuple(key)
+    raise ValueError(f"Unknown operation: {op}")
+
+
+def _aes_batch(cipher, mode, payloads):
+    for data in payloads:
+        if len(data) % 16:
+            raise ValueError("AES payload must be a multiple of 16 bytes")
+
+    if mode == 'encrypt':
+        # The whole batch goes through one encrypt_blocks call (NumPy), then
+        # the result is cut back into one piece per payload
+        try:
+            combined = cipher.encrypt_blocks(b''.join(payloads))
+        except ImportError:
+            combined = None
+        if combined is not None:
+            results, start = [], 0
+            for data in payloads:
+                results.append(combined[start:start + len(data)])
+                start += len(data)
+            return results
+
+    process = cipher.encrypt_block if mode == 'encrypt' else cipher.decrypt_block
+    return [b''.join(bytes(process(data[i:i + 16])) for i in range(0, len(data), 16))
+            for data in payloads]
+
+
+def _vigenere_batch(key, mode, payloads):
+    return [ciphers.vigenere_cipher(data.decode(), key, mode).encode() for data in payloads]
+
+
+def _playfair_batch(key, mode, payloads):
+    texts = [data.decode() for data in payloads]
+    results = key.encrypt_many(texts) if mode == 'encrypt' else key.decrypt_many(texts)
+    return [text.encode() for text in results]
+
+
+def _hill_batch(matrix, mode, payloads):
+    texts = ciphers.hill_cipher_batch([data.decode() for data in payloads], matrix, mode)
+    return [text.encode() for text in texts]
+
+
+def _rsa_batch(key, mode, payloads):
+    rsa = ciphers.rsa
+    if mode == 'encrypt':
+        return [json.dumps(rsa.encrypt(key, data.decode())).encode() for data in payloads]
+    return [rsa.decrypt(key, json.loads(data)).encode() for data in payloads]
+
+
+BATCH_HANDLERS = {
+    'aes': _aes_batch,
+    'vigenere': _vigenere_batch,
+    'playfair': _playfair_batch,
+    'hill': _hill_batch,
+    'rsa': _rsa_batch,
+}
+
+
+def run_batch(op, mode, key, payloads):
+    """
+    Processes a batch of requests that share op, mode and key.
+
+    Returns:
+        list: (ok, result bytes or error message) per payload.
+    """
+    handler = BATCH_HANDLERS[op]
+    try:
+        prepared = _prepared_key(op, mode, key)
+        return [(True, result) for result in handler(prepared, mode, payloads)]
+    except Exception as e:
+        if len(payloads) == 1:
+            return [(False, f"{type(e).__name__}: {e}")]
+    # One bad request shouldn't fail the others: run them one at a time
+    return [run_batch(op, mode, key, [payload])[0] for payload in payloads]
+
+
+# =========================================
+# Server
+# =========================================
+
+def _percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class CipherServer:
+    def __init__(self, workers=None, max_in_flight=MAX_IN_FLIGHT,
+                 batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+
+        self.pool = None
+        self.in_flight = None
+        self.pending = {} # (op, mode, key) -> [(payload, future), ...]
+
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """Starts listening on a TCP port, or on a Unix socket if path is given."""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        if path:
+            return await asyncio.start_unix_server(self._handle, path=path)
+        return await asyncio.start_server(self._handle, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Batching ---
+
+    async def submit(self, op, mode, key, payload):
+        """Queues one request and waits for its result."""
+        if op not in BATCH_HANDLERS:
+            raise ValueError(f"Unknown operation: {op}")
+        if mode not in MODES:
+            raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
+
+        loop = asyncio.get_running_loop()
+        batch_key = (op, mode, _freeze(key))
+        future = loop.create_future()
+        batch = self.pending.get(batch_key)
+        if batch is None:
+            batch = self.pending[batch_key] = []
+            loop.call_later(self.batch_delay, self._flush, batch_key, batch)
+        batch.append((payload, future))
+        if len(batch) >= self.batch_size:
+            self._flush(batch_key, batch)
+        return await future
+
+    def _flush(self, batch_key, batch):
+        if self.pending.get(batch_key) is not batch:
+            return # already sent because it was full
+        del self.pending[batch_key]
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(self.pool, run_batch, *batch_key, [payload for payload, _ in batch])
+        work.add_done_callback(lambda done: self._deliver(done, batch))
+
+    @staticmethod
+    def _deliver(done, batch):
+        futures = [future for _, future in batch]
+        if done.exception() is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(done.exception())
+            return
+        for future, (ok, result) in zip(futures, done.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(ValueError(result))
+
+    # --- Connections ---
+
+    async def _handle(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header, payload = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError as e:
+                    async with write_lock:
+                        write_frame(writer, {'id': None, 'ok': False, 'error': str(e)})
+                    break
+                # Backpressure: while too much work is pending, stop reading
+                # so the sockets (and then the clients) fill up and wait
+                await self.in_flight.acquire()
+                task = asyncio.create_task(self._respond(header, payload, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, header, payload, writer, write_lock):
+        start = time.perf_counter()
+        response = {'id': None, 'ok': True}
+        try:
+            # Built inside the try, so the in-flight permit is always released
+            response['id'] = header.get('id')
+            if header.get('op') == 'stats':
+                result = json.dumps(self.stats()).encode()
+            else:
+                result = await self.submit(header.get('op'), header.get('mode', 'encrypt'),
+                                           header.get('key'), payload)
+        except Exception as e:
+            response.update(ok=False, error=str(e))
+            result = b''
+            self.errors += 1
+        finally:
+            self.in_flight.release()
+
+        async with write_lock:
+            write_frame(writer, response, result)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return
+        self.requests += 1
+        self.bytes += len(payload)
+        self.latencies.append(time.perf_counter() - start)
+
+    def stats(self):
+        """Request counts, throughput and p50/p99 latency (ms) since start."""
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'seconds': elapsed,
+            'requests_per_s': self.requests / elapsed if elapsed else 0.0,
+            'mb_per_s': self.bytes / elapsed / 1e6 if elapsed else 0.0,
+            'p50_ms': _percentile(ordered, 50) * 1e3,
+            'p99_ms': _percentile(ordered, 99) * 1e3,
+        }
+
+
+# =========================================
+# Client
+# =========================================
+
+class CipherClient:
+    """
+    Talks to a CipherServer. Requests can be pipelined: many request()
+    calls may be awaited at the same time on one connection.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {} # request id -> future
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                header, payload = await read_frame(self.reader)
+                future = self.waiting.pop(header.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if header.get('ok'):
+                    future.set_result(payload)
+                else:
+                    future.set_exception(ValueError(header.get('error')))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Connection closed: {e}"))
+            self.waiting.clear()
+
+    async def request(self, op, payload=b'', key=None, mode='encrypt'):
+        """Sends one request and returns the result payload (bytes)."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        write_frame(self.writer, {'id': self.next_id, 'op': op, 'mode': mode, 'key': key}, payload)
+        await self.writer.drain()
+        return await future
+
+    async def stats(self):
+        return json.loads(await self.request('stats'))
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.receiver.cancel()
+
+
+# =========================================
+# Command Line
+# =========================================
+
+# Sample request per operation for the bench command
+BENCH_REQUESTS = {
+    'aes': ('000102030405060708090a0b0c0d0e0f', lambda size: os.urandom(max(16, size // 16 * 16))),
+    'vigenere': ('LEMON', lambda size: ('attack at dawn ' * (size // 15 + 1))[:size]),
+    'playfair': ('PLAYFAIR EXAMPLE', lambda size: ('hide the gold ' * (size // 14 + 1))[:size]),
+    'hill': ('GYBNQKURP', lambda size: ('act now ' * (size // 8 + 1))[:size]),
+    'rsa': ([17, 3233], lambda size: ('RSA text ' * (size // 9 + 1))[:size]),
+}
+
+
+async def _report(server, interval):
+    while True:
+        await asyncio.sleep(interval)
+        stats = server.stats()
+        print(f"{stats['requests']} requests ({stats['errors']} errors) in {stats['batches']} batches, "
+              f"{stats['requests_per_s']:.0f} req/s, {stats['mb_per_s']:.2f} MB/s, "
+              f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms", file=sys.stderr)
+
+
+async def serve(args):
+    server = CipherServer(args.workers, args.max_in_flight, args.batch_size, args.batch_delay)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Listening on {where} with {server.workers} workers", file=sys.stderr)
+    reporter = asyncio.create_task(_report(server, args.report_interval)) if args.report_interval else None
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if reporter:
+            reporter.cancel()
+        server.close()
+
+
+async def bench(args):
+    key, make_payload = BENCH_REQUESTS[args.op]
+    payload = make_payload(args.size)
+    clients = [await CipherClient.connect(args.host, args.port, args.unix) for _ in range(args.clients)]
+    latencies = []
+
+    async def worker(client, count):
+        for _ in range(count):
+            start = time.perf_counter()
+            await client.request(args.op, payload, key, 'encrypt')
+            latencies.append(time.perf_counter() - start)
+
+    per_client = args.requests // len(clients)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client, per_client) for client in clients))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = per_client * len(clients)
+    print(f"{args.op}: {total} requests of {args.size} bytes from {len(clients)} clients in {elapsed:.2f}s")
+    print(f"  {total / elapsed:.0f} req/s, {total * args.size / elapsed / 1e6:.2f} MB/s, "
+          f"p50 {_percentile(latencies, 50) * 1e3:.2f} ms, p99 {_percentile(latencies, 99) * 1e3:.2f} ms")
+    print(f"  server: {await clients[0].stats()}")
+    for client in clients:
+        await client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cipher service over TCP or a Unix socket.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('serve', 'bench'):
+        command = commands.add_parser(name)
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, default=DEFAULT_PORT)
+        command.add_argument('--unix', help="Unix socket path (instead of TCP)")
+
+    serve_parser = commands.choices['serve']
+    serve_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    serve_parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT)
+    serve_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    serve_parser.add_argument('--batch-delay', type=float, default=BATCH_DELAY, help="seconds")
+    serve_parser.add_argument('--report-interval', type=float, default=10.0,
+                              help="seconds between statistics lines on stderr (0 turns them off)")
+
+    bench_parser = commands.choices['bench']
+    bench_parser.add_argument('--op', choices=sorted(BENCH_REQUESTS), default='vigenere')
+    bench_parser.add_argument('--clients', type=int, default=8)
+    bench_parser.add_argument('--requests', type=int, default=2000)
+    bench_parser.add_argument('--size', type=int, default=256, help="payload bytes per request")
+
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args) if args.command == 'serve' else bench(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+One import for every cipher in this repo.
+
+Nothing is loaded up front: the first time a name is used, the module that
+defines it is imported (module __getattr__, PEP 562) and the value is kept
+here. So `ciphers.caesar_cipher` only pays for caesar_cipher.py, not for
+NumPy, AES or RSA.
+
+    import ciphers
+    ciphers.caesar_cipher("Hello", 3, 'encrypt')
+    ciphers.rsa.generate_keypair(bits=1024)
+
+The demos that used to run on import are behind `__main__` in each module:
+
+    python ciphers.py            # list the demos
+    python ciphers.py caesar     # run one of them
+"""
+import importlib
+import sys
+
+# Short name -> module, for everything the modules offer
+MODULES = {
+    'aes': 'AES_en',
+    'aes_stream': 'aes_stream',
+    'rsa': 'RSA_algo',
+    'caesar': 'caesar_cipher',
+    'vigenere': 'vigenere_cipher',
+    'vigenere_analysis': 'vigenere_analysis',
+    'playfair': 'playfair_cipher',
+    'playfair_solver': 'playfair_solver',
+    'hill': 'hill_cipheer',
+}
+
+# Name -> module that defines it (names that mean the same thing in more
+# than one module, like encrypt/decrypt, are only reachable via MODULES)
+EXPORTS = {
+    # AES
+    'AES': 'AES_en',
+    'TableAES': 'AES_en',
+    'pkcs7_pad': 'AES_en',
+    'pkcs7_unpad': 'AES_en',
+    'encrypt_file': 'aes_stream',
+    'decrypt_file': 'aes_stream',
+    # RSA
+    'generate_keypair': 'RSA_algo',
+    'RSAPrivateKey': 'RSA_algo',
+    'encrypt_bytes': 'RSA_algo',
+    'decrypt_bytes': 'RSA_algo',
+    # Caesar
+    'caesar_cipher': 'caesar_cipher',
+    'caesar_stream': 'caesar_cipher',
+    'crack_caesar': 'caesar_cipher',
+    'crack_caesar_batch': 'caesar_cipher',
+    # Vigenère
+    'vigenere_cipher': 'vigenere_cipher',
+    'crack_vigenere': 'vigenere_analysis',
+    'crack_vigenere_many': 'vigenere_analysis',
+    # Playfair
+    'playfair_cipher': 'playfair_cipher',
+    'PlayfairKey': 'playfair_cipher',
+    'solve_playfair': 'playfair_solver',
+    # Hill
+    'hill_cipher': 'hill_cipheer',
+    'hill_cipher_batch': 'hill_cipheer',
+    'create_key_matrix': 'hill_cipheer',
+    'matrix_mod_inverse': 'hill_cipheer',
+}
+
+# Demo name -> module whose __main__ block runs it
+DEMOS = {name: module for name, module in MODULES.items() if name != 'aes_stream'}
+
+__all__ = sorted(MODULES) + sorted(EXPORTS)
+
+
+def __getattr__(name):
+    if name in MODULES:
+        value = importlib.import_module(MODULES[name])
+    elif name in EXPORTS:
+        value = getattr(importlib.import_module(EXPORTS[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value # later lookups don't go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def main(argv=None):
+    import argparse
+    import runpy
+
+    parser = argparse.ArgumentParser(description="Run the example for one of the ciphers.")
+    parser.add_argument('demo', nargs='?', choices=sorted(DEMOS))
+    args = parser.parse_args(argv)
+
+    if args.demo is None:
+        print("Demos: " + ", ".join(sorted(DEMOS)))
+        return 0
+    runpy.run_module(DEMOS[args.demo], run_name='__main__', alter_sys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
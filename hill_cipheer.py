@@ -1,3 +1,8 @@
+import math
+import random
+from functools import lru_cache
+from itertools import chain, combinations, islice
+
 import numpy as np
 
 def create_key_matrix(key_string, n):
@@ -12,35 +17,121 @@ def create_key_matrix(key_string, n):
     key_matrix = np.array(key).reshape(n, n)
     return key_matrix
 
+def extended_gcd(a, b):
+    """Returns (g, x, y) such that a*x + b*y = g = gcd(a, b)."""
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b != 0:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
 def modular_inverse(a, m):
     """Finds the modular multiplicative inverse of a under modulo m."""
-    for i in range(1, m):
-        if (a * i) % m == 1:
-            return i
-    return None # No modular inverse exists
+    g, x, _ = extended_gcd(a % m, m)
+    if g != 1:
+        return None # No modular inverse exists
+    return x % m
+
+# Number of inverted key matrices kept in memory
+INVERSE_CACHE_SIZE = 256
 
 def matrix_mod_inverse(matrix, modulus):
     """
     Finds the modular inverse of a matrix.
     The matrix must be square and its determinant must be coprime to the modulus.
+
+    Uses exact integer Gauss-Jordan elimination mod `modulus` (no floats),
+    so it works for any size. Results are cached per matrix.
     """
-    # Calculate the determinant
-    det = int(np.round(np.linalg.det(matrix))) % modulus
-    
-    # Find the modular inverse of the determinant
-    det_inv = modular_inverse(det, modulus)
-    
-    if det_inv is None:
-        raise ValueError("Matrix is not invertible (determinant has no modular inverse).")
-        
-    # Calculate the adjugate matrix (using the formula: adj(A) = det(A) * inv(A))
-    # NumPy's inv() returns floats, so we round and convert to int
-    adjugate = np.round(np.linalg.det(matrix) * np.linalg.inv(matrix)).astype(int)
-    
-    # The modular inverse is (det_inv * adjugate) mod modulus
-    inverse_matrix = (det_inv * adjugate) % modulus
-    
-    return inverse_matrix
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError("Matrix must be square.")
+    key = (matrix.shape[0], tuple(int(v) for v in matrix.ravel()), int(modulus))
+    return _cached_mod_inverse(*key).copy()
+
+@lru_cache(maxsize=INVERSE_CACHE_SIZE)
+def _cached_mod_inverse(n, entries, modulus):
+    # Python ints are used for big moduli so nothing can overflow
+    dtype = np.int64 if modulus < 2 ** 31 else object
+    # Augmented matrix [A | I]; row operations turn it into [I | A^-1]
+    aug = np.zeros((n, 2 * n), dtype=dtype)
+    aug[:, :n] = np.array(entries, dtype=dtype).reshape(n, n) % modulus
+    aug[:, n:] = np.eye(n, dtype=np.int64)
+
+    for col in range(n):
+        # Look for a pivot that is invertible mod m
+        pivot = None
+        for row in range(col, n):
+            if extended_gcd(int(aug[row, col]), modulus)[0] == 1:
+                pivot = row
+                break
+
+        if pivot is None:
+            # With a composite modulus (like 26) no single entry may be
+            # invertible even if the matrix is. Combine rows with the
+            # Euclidean algorithm (these row operations have determinant 1)
+            # until the pivot holds the gcd of the column.
+            for row in range(col + 1, n):
+                a, b = int(aug[col, col]), int(aug[row, col])
+                if b == 0:
+                    continue
+                g, x, y = extended_gcd(a, b)
+                top = (x * aug[col] + y * aug[row]) % modulus
+                aug[row] = ((a // g) * aug[row] - (b // g) * aug[col]) % modulus
+                aug[col] = top
+            if extended_gcd(int(aug[col, col]), modulus)[0] != 1:
+                raise ValueError("Matrix is not invertible (determinant has no modular inverse).")
+            pivot = col
+
+        # Move the pivot row up and scale it so the pivot is 1
+        if pivot != col:
+            aug[[col, pivot]] = aug[[pivot, col]]
+        aug[col] = (aug[col] * modular_inverse(int(aug[col, col]), modulus)) % modulus
+
+        # Clear the column in every other row at once
+        factors = aug[:, col].copy()
+        factors[col] = 0
+        aug = (aug - np.outer(factors, aug[col])) % modulus
+
+    inverse = aug[:, n:].astype(np.int64) if dtype is np.int64 else aug[:, n:]
+    inverse.flags.writeable = False # shared through the cache
+    return inverse
+
+def _cipher_matrix(key_matrix, mode, modulus):
+    # Determine the matrix to use (key or its inverse)
+    if mode == 'encrypt':
+        return np.asarray(key_matrix, dtype=np.int64)
+    if mode == 'decrypt':
+        return matrix_mod_inverse(key_matrix, modulus).astype(np.int64)
+    raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
+
+def _letter_numbers(text):
+    # Prepare the text: letters only, uppercase, as numbers (A=0 ... Z=25)
+    text = ''.join(filter(str.isalpha, text)).upper()
+    if text.isascii():
+        numbers = np.frombuffer(text.encode('ascii'), dtype=np.uint8).astype(np.int64)
+    else:
+        numbers = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    return numbers - ord('A')
+
+def _text_to_numbers(text, n):
+    numbers = _letter_numbers(text)
+
+    # Pad the text if its length is not a multiple of n
+    padding_needed = -len(numbers) % n
+    if padding_needed:
+        numbers = np.concatenate((numbers, np.full(padding_needed, ord('X') - ord('A'))))
+    return numbers
+
+def _apply_matrix(matrix, numbers, modulus):
+    # All blocks at once: every block of n letters is one column of an
+    # (n, L/n) matrix, so the whole text is a single matrix product
+    n = matrix.shape[0]
+    blocks = numbers.reshape(-1, n).T
+    result = (matrix @ blocks) % modulus
+    # Back to letters in one pass: transpose to block order, add 'A', decode
+    return (result.T.ravel() + ord('A')).astype(np.uint8).tobytes().decode('ascii')
 
 def hill_cipher(text, key_matrix, mode):
     """
@@ -53,88 +144,279 @@ def hill_cipher(text, key_matrix, mode):
     """
     n = key_matrix.shape[0]
     modulus = 26
-    
-    # Determine the matrix to use (key or its inverse)
-    if mode == 'encrypt':
-        matrix_to_use = key_matrix
-    elif mode == 'decrypt':
-        matrix_to_use = matrix_mod_inverse(key_matrix, modulus)
+    matrix_to_use = _cipher_matrix(key_matrix, mode, modulus)
+    return _apply_matrix(matrix_to_use, _text_to_numbers(text, n), modulus)
+
+def hill_cipher_batch(texts, key_matrix, mode):
+    """
+    Encrypts or decrypts many messages (of any lengths) under one key.
+
+    Each message is prepared and padded on its own, then all blocks of all
+    messages go through one matrix product.
+
+    Returns:
+        list: The processed strings, in the same order as texts.
+    """
+    n = key_matrix.shape[0]
+    modulus = 26
+    matrix_to_use = _cipher_matrix(key_matrix, mode, modulus)
+
+    parts = [_text_to_numbers(text, n) for text in texts]
+    if not parts:
+        return []
+    combined = _apply_matrix(matrix_to_use, np.concatenate(parts), modulus)
+
+    results = []
+    start = 0
+    for part in parts:
+        results.append(combined[start:start + len(part)])
+        start += len(part)
+    return results
+
+# --- Cryptanalysis (known plaintext) ---
+
+# Most subsets of plaintext blocks tried when looking for an invertible one
+MAX_BLOCK_COMBINATIONS = 10000
+
+def _invertible_blocks(plain_blocks, n, modulus=26):
+    """
+    Picks n plaintext blocks (columns) that form an invertible matrix.
+
+    Returns:
+        tuple: (column indices, inverse of those columns), or None.
+    """
+    count = plain_blocks.shape[1]
+    if count < n:
+        return None
+    if math.comb(count, n) <= MAX_BLOCK_COMBINATIONS:
+        # Few enough to try them all (and know there's none if this fails)
+        candidates = combinations(range(count), n)
     else:
-        raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
-        
-    # Prepare the text
-    text = ''.join(filter(str.isalpha, text)).upper()
-    
-    # Pad the text if its length is not a multiple of n
-    if len(text) % n != 0:
-        padding_needed = n - (len(text) % n)
-        text += 'X' * padding_needed
-        
-    result = ""
-    
-    # Process the text in blocks of size n
-    for i in range(0, len(text), n):
-        block = text[i:i+n]
-        # Convert block of letters to a column vector of numbers
-        block_vector = np.array([ord(char) - ord('A') for char in block]).reshape(n, 1)
-        
-        # Perform matrix multiplication
-        result_vector = np.dot(matrix_to_use, block_vector) % modulus
-        
-        # Convert result vector back to letters and append to result
-        for j in range(n):
-            result += chr(result_vector[j][0] + ord('A'))
-            
-    return result
+        # Neighbouring blocks first, then random subsets (seeded, so results
+        # repeat). Going through all combinations in order would keep the
+        # first blocks and miss good subsets if those are dependent.
+        rng = random.Random(0)
+        candidates = chain((range(start, start + n) for start in range(count - n + 1)),
+                           (sorted(rng.sample(range(count), n)) for _ in iter(int, 1)))
+    for columns in islice(candidates, MAX_BLOCK_COMBINATIONS):
+        columns = list(columns)
+        try:
+            return columns, matrix_mod_inverse(plain_blocks[:, columns], modulus).astype(np.int64)
+        except ValueError:
+            continue
+    return None
+
+def recover_key(plaintext, ciphertext, n):
+    """
+    Recovers the key matrix from a known plaintext/ciphertext pair.
+
+    Encryption is C = K P (blocks are columns), so with n plaintext blocks
+    that are invertible mod 26, K = C P^-1. The key is then checked
+    against every other block.
+
+    Args:
+        plaintext (str): The known plaintext (prepared and padded like hill_cipher does).
+        ciphertext (str): The matching ciphertext.
+        n (int): The size of the key matrix.
+
+    Returns:
+        np.array: The n x n key matrix.
+    """
+    modulus = 26
+    plain = _text_to_numbers(plaintext, n)
+    cipher = _letter_numbers(ciphertext)
+    length = min(len(plain), len(cipher)) // n * n
+    if length < n * n:
+        raise ValueError(f"Need at least {n * n} letters of plaintext and ciphertext for a {n}x{n} key.")
+
+    plain_blocks = plain[:length].reshape(-1, n).T
+    cipher_blocks = cipher[:length].reshape(-1, n).T
+    found = _invertible_blocks(plain_blocks, n, modulus)
+    if found is None:
+        raise ValueError("Plaintext blocks are not invertible, the key cannot be recovered.")
+    columns, plain_inverse = found
+
+    key_matrix = (cipher_blocks[:, columns] @ plain_inverse) % modulus
+    if not np.array_equal((key_matrix @ plain_blocks) % modulus, cipher_blocks):
+        raise ValueError("Plaintext and ciphertext are not consistent with any key.")
+    return key_matrix
+
+# Letters of context decrypted on each side of a crib match
+CRIB_CONTEXT = 40
+
+def _batch_inverse_prime(matrices, prime):
+    # Gauss-Jordan on a (k, n, n) stack at once, over the field Z/prime.
+    # Returns (inverses, invertible mask).
+    k, n, _ = matrices.shape
+    aug = np.concatenate((matrices % prime, np.broadcast_to(np.eye(n, dtype=np.int64), (k, n, n))), axis=2)
+    invertible = np.ones(k, dtype=bool)
+    inverse_of = np.array([modular_inverse(x, prime) or 0 for x in range(prime)], dtype=np.int64)
+    batch = np.arange(k)
+
+    for col in range(n):
+        # First row at or below the diagonal with a nonzero entry
+        nonzero = aug[:, col:, col] != 0
+        invertible &= nonzero.any(axis=1)
+        pivot = col + nonzero.argmax(axis=1)
+        pivot_rows = aug[batch, pivot].copy()
+        aug[batch, pivot] = aug[:, col]
+        aug[:, col] = (pivot_rows * inverse_of[pivot_rows[:, col]][:, None]) % prime
+
+        factors = aug[:, :, col].copy()
+        factors[:, col] = 0
+        aug = (aug - factors[:, :, None] * aug[:, col][:, None, :]) % prime
+
+    return aug[:, :, n:], invertible
+
+def _batch_inverse_26(matrices):
+    # 26 = 2 * 13: invert mod both primes and combine them (CRT). Since
+    # 13 = 1 (mod 2), x = b + 13 * ((a - b) mod 2) is a mod 2 and b mod 13.
+    inverse_2, ok_2 = _batch_inverse_prime(matrices, 2)
+    inverse_13, ok_13 = _batch_inverse_prime(matrices, 13)
+    return inverse_13 + 13 * ((inverse_2 - inverse_13) % 2), ok_2 & ok_13
+
+def crib_search(ciphertext, crib, n):
+    """
+    Slides a known word (crib) across the ciphertext and recovers the key
+    at every position where it fits.
+
+    The full blocks covered by the crib give the key (the crib must be at
+    least n*n + n - 1 letters long to cover n blocks at every alignment).
+    Alignments with the same block offset share the same plaintext blocks,
+    so all their keys come from one batched matrix product, and wrong
+    positions are rejected in the same batch: by any further full blocks,
+    and by the crib letters left over at both ends, which must come out of
+    the partial blocks decrypted with the key's inverse. Only the keys that
+    pass are checked with hill_cipher, on a window around the crib.
+
+    A crib that exactly fills n blocks leaves nothing to check against, so
+    every alignment fits; use a longer crib for unambiguous results.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        crib (str): A word or phrase expected in the plaintext.
+        n (int): The size of the key matrix.
+
+    Returns:
+        list: (position, key matrix, plaintext) tuples, in position order.
+        position is the letter index where the crib starts and plaintext is
+        the decrypted text around it (hill_cipher(ciphertext, key, 'decrypt')
+        gives all of it).
+    """
+    modulus = 26
+    cipher = _letter_numbers(ciphertext)
+    cipher = cipher[:len(cipher) // n * n]
+    cipher_text = (cipher + ord('A')).astype(np.uint8).tobytes().decode('ascii', 'replace')
+    crib_numbers = _letter_numbers(crib)
+    if ((crib_numbers < 0) | (crib_numbers >= modulus)).any():
+        raise ValueError("Crib must only contain the letters A-Z.")
+    crib_text = ''.join(chr(ord('A') + c) for c in crib_numbers)
+
+    found = []
+    for shift in range(n):
+        # Crib positions whose first full block starts `shift` letters in
+        positions = np.arange((n - shift) % n, len(cipher) - len(crib_numbers) + 1, n)
+        blocks = (len(crib_numbers) - shift) // n
+        if blocks < n or len(positions) == 0:
+            continue
+        tail = len(crib_numbers) - shift - blocks * n
+
+        plain_blocks = crib_numbers[shift:shift + blocks * n].reshape(-1, n).T
+        invertible = _invertible_blocks(plain_blocks, n, modulus)
+        if invertible is None:
+            continue
+        columns, plain_inverse = invertible
+
+        # cipher_blocks[k, i, j] = letter i of block j at position k
+        offsets = np.arange(blocks)[None, :] * n + np.arange(n)[:, None]
+        starts = positions + shift
+        cipher_blocks = cipher[starts[:, None, None] + offsets]
+        keys = (cipher_blocks[:, :, columns] @ plain_inverse) % modulus
+
+        # Keep only the keys that also explain every other crib block
+        fits = ((keys @ plain_blocks) % modulus == cipher_blocks).all(axis=(1, 2))
+
+        if shift or tail:
+            # The crib letters in the partial blocks at either end must
+            # decrypt correctly too (this needs the key's inverse)
+            inverses, has_inverse = _batch_inverse_26(keys[fits])
+            keep = has_inverse
+            if shift:
+                before = cipher[(starts[fits] - n)[:, None] + np.arange(n)]
+                decrypted = np.einsum('kij,kj->ki', inverses, before) % modulus
+                keep &= (decrypted[:, n - shift:] == crib_numbers[:shift]).all(axis=1)
+            if tail:
+                after = cipher[(starts[fits] + blocks * n)[:, None] + np.arange(n)]
+                decrypted = np.einsum('kij,kj->ki', inverses, after) % modulus
+                keep &= (decrypted[:, :tail] == crib_numbers[len(crib_numbers) - tail:]).all(axis=1)
+            fits[np.flatnonzero(fits)[~keep]] = False
+
+        for position, key_matrix in zip(positions[fits], keys[fits]):
+            found.append((int(position), key_matrix))
+
+    results = []
+    for position, key_matrix in sorted(found, key=lambda f: f[0]):
+        # Decrypt whole blocks around the crib only
+        first = max(0, position - CRIB_CONTEXT) // n * n
+        last = min(len(cipher), -(-(position + len(crib_numbers) + CRIB_CONTEXT) // n) * n)
+        try:
+            plaintext = hill_cipher(cipher_text[first:last], key_matrix, 'decrypt')
+        except ValueError:
+            continue # key isn't invertible, so it can't be the real one
+        offset = position - first
+        if plaintext[offset:offset + len(crib_text)] == crib_text:
+            results.append((position, key_matrix, plaintext))
+    return results
 
 # --- Example Usage ---
 
-# 1. Example with a 2x2 matrix
-print("--- 2x2 Example ---")
-key_str_2x2 = "DDFC"
-plaintext_2x2 = "help me"
-try:
-    key_matrix_2x2 = create_key_matrix(key_str_2x2, 2)
-
-    encrypted_text = hill_cipher(plaintext_2x2, key_matrix_2x2, 'encrypt')
-    print(f"Plaintext:  {plaintext_2x2}")
-    print(f"Key String: {key_str_2x2}")
-    print(f"Encrypted:  {encrypted_text}")
-
-    decrypted_text = hill_cipher(encrypted_text, key_matrix_2x2, 'decrypt')
-    print(f"Decrypted:  {decrypted_text}")
-except ValueError as e:
-    print(f"Error: {e}")
-
-print("\n" + "-"*20 + "\n")
-
-# 2. Example with a 3x3 matrix (a classic example)
-print("--- 3x3 Example ---")
-key_str_3x3 = "GYBNQKURP" # A valid invertible key
-plaintext_3x3 = "ACT"
-try:
-    key_matrix_3x3 = create_key_matrix(key_str_3x3, 3)
-
-    encrypted_text_3x3 = hill_cipher(plaintext_3x3, key_matrix_3x3, 'encrypt')
-    print(f"Plaintext:  {plaintext_3x3}")
-    print(f"Key String: {key_str_3x3}")
-    print(f"Encrypted:  {encrypted_text_3x3}")
-
-    decrypted_text_3x3 = hill_cipher(encrypted_text_3x3, key_matrix_3x3, 'decrypt')
-    print(f"Decrypted:  {decrypted_text_3x3}")
-except ValueError as e:
-    print(f"Error: {e}")
-    
-print("\n" + "-"*20 + "\n")
-
-# 3. Example with a non-invertible key
-print("--- Invalid Key Example ---")
-key_str_invalid = "ABCD" # det=AD-BC = 3*0 - 1*2 = -2 mod 26 = 24. gcd(24,26) != 1
-plaintext_invalid = "test"
-try:
-    key_matrix_invalid = create_key_matrix(key_str_invalid, 2)
-    encrypted_invalid = hill_cipher(plaintext_invalid, key_matrix_invalid, 'encrypt')
-    print(f"Encrypted with invalid key: {encrypted_invalid}")
-    decrypted_invalid = hill_cipher(encrypted_invalid, key_matrix_invalid, 'decrypt')
-except ValueError as e:
-    print(f"Error during decryption: {e}")
\ No newline at end of file
+if __name__ == '__main__':
+    # 1. Example with a 2x2 matrix
+    print("--- 2x2 Example ---")
+    key_str_2x2 = "DDFC"
+    plaintext_2x2 = "help me"
+    try:
+        key_matrix_2x2 = create_key_matrix(key_str_2x2, 2)
+
+        encrypted_text = hill_cipher(plaintext_2x2, key_matrix_2x2, 'encrypt')
+        print(f"Plaintext:  {plaintext_2x2}")
+        print(f"Key String: {key_str_2x2}")
+        print(f"Encrypted:  {encrypted_text}")
+
+        decrypted_text = hill_cipher(encrypted_text, key_matrix_2x2, 'decrypt')
+        print(f"Decrypted:  {decrypted_text}")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+    print("\n" + "-"*20 + "\n")
+
+    # 2. Example with a 3x3 matrix (a classic example)
+    print("--- 3x3 Example ---")
+    key_str_3x3 = "GYBNQKURP" # A valid invertible key
+    plaintext_3x3 = "ACT"
+    try:
+        key_matrix_3x3 = create_key_matrix(key_str_3x3, 3)
+
+        encrypted_text_3x3 = hill_cipher(plaintext_3x3, key_matrix_3x3, 'encrypt')
+        print(f"Plaintext:  {plaintext_3x3}")
+        print(f"Key String: {key_str_3x3}")
+        print(f"Encrypted:  {encrypted_text_3x3}")
+
+        decrypted_text_3x3 = hill_cipher(encrypted_text_3x3, key_matrix_3x3, 'decrypt')
+        print(f"Decrypted:  {decrypted_text_3x3}")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+    print("\n" + "-"*20 + "\n")
+
+    # 3. Example with a non-invertible key
+    print("--- Invalid Key Example ---")
+    key_str_invalid = "ABCD" # det=AD-BC = 3*0 - 1*2 = -2 mod 26 = 24. gcd(24,26) != 1
+    plaintext_invalid = "test"
+    try:
+        key_matrix_invalid = create_key_matrix(key_str_invalid, 2)
+        encrypted_invalid = hill_cipher(plaintext_invalid, key_matrix_invalid, 'encrypt')
+        print(f"Encrypted with invalid key: {encrypted_invalid}")
+        decrypted_invalid = hill_cipher(encrypted_invalid, key_matrix_invalid, 'decrypt')
+    except ValueError as e:
+        print(f"Error during decryption: {e}")
@@ -0,0 +1,321 @@
+"""
+Optional instrumentation for the cipher modules.
+
+Nothing is measured until enable() is called: it replaces the hot-path and
+setup functions listed in HOT_PATHS with timing wrappers, and disable()
+puts the originals back. So when it's off there is no overhead at all,
+and the cipher modules themselves are never edited.
+
+    import instrumentation
+    instrumentation.enable()
+    ...                                   # run the workload
+    print(instrumentation.snapshot())     # dict
+    print(instrumentation.prometheus_text())
+
+    with instrumentation.profiled('aes.prof.txt'):            # cProfile
+        ...
+    with instrumentation.profiled('aes.mem.txt', tool='tracemalloc'):
+        ...
+
+Wrappers are installed on the modules and classes, so code that looks
+functions up at call time (methods, module globals, the ciphers facade)
+is measured. A function imported by name *before* enable() (from X
+import f) keeps the unwrapped version.
+"""
+import cProfile
+import functools
+import importlib
+import inspect
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Module -> (attribute, index of the argument whose len() is counted as
+# bytes processed, or None). 'Class.method' patches the method on the class.
+HOT_PATHS = {
+    'AES_en': [
+        ('AES.key_expansion', None),
+        ('AES.gmul', None),
+        ('AES.encrypt_block', 1),
+        ('AES.decrypt_block', 1),
+        ('AES.encrypt_blocks', None),
+        ('AES.encrypt_ctr', 1),
+        ('TableAES.encrypt_block', 1),
+        ('TableAES.decrypt_block', 1),
+        ('key_schedule', None),
+        ('table_key_schedule', None),
+    ],
+    'RSA_algo': [
+        ('generate_keypair', None),
+        ('generate_prime', None),
+        ('is_probable_prime', None),
+        ('encrypt', 1),
+        ('decrypt', 1),
+        ('encrypt_bytes', 1),
+        ('decrypt_bytes', 1),
+        ('RSAPrivateKey.decrypt_int', None),
+        ('RSAPrivateKey.decrypt_batch', 1),
+    ],
+    'caesar_cipher': [
+        ('caesar_cipher', 0),
+        ('crack_caesar_batch', None),
+    ],
+    'vigenere_cipher': [
+        ('vigenere_cipher', 0),
+        ('vigenere_cipher_np', 0),
+    ],
+    'playfair_cipher': [
+        ('generate_key_table', None),
+        ('prepare_plaintext', 0),
+        ('compile_key', None),
+        ('PlayfairKey.process', 1),
+        ('playfair_cipher', 0),
+    ],
+    'hill_cipheer': [
+        ('create_key_matrix', None),
+        ('matrix_mod_inverse', None),
+        ('hill_cipher', 0),
+        ('hill_cipher_batch', None),
+    ],
+}
+
+# lru_cache'd functions whose hit rates are reported (module, attribute)
+CACHES = [
+    ('AES_en', 'key_schedule'),
+    ('AES_en', 'table_key_schedule'),
+    ('playfair_cipher', 'compile_key'),
+    ('hill_cipheer', '_cached_mod_inverse'),
+]
+
+# Function name -> [calls, seconds, bytes]
+_stats = {}
+# (owner, attribute, original value) for everything that was replaced
+_patches = []
+
+
+def _wrap(name, func, size_arg):
+    stats = _stats.setdefault(name, [0, 0.0, 0])
+    clock = time.perf_counter
+
+    if size_arg is None:
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[1] += clock() - start
+                stats[0] += 1
+    else:
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[1] += clock() - start
+                stats[0] += 1
+                try:
+                    stats[2] += len(args[size_arg])
+                except (IndexError, TypeError):
+                    pass
+
+    functools.update_wrapper(wrapper, func)
+    # Keep lru_cache's cache_info()/cache_clear() reachable
+    for attr in ('cache_info', 'cache_clear'):
+        if hasattr(func, attr):
+            setattr(wrapper, attr, getattr(func, attr))
+    return wrapper
+
+
+def _patch(module, path, size_arg):
+    owner = module
+    *parents, attr = path.split('.')
+    for parent in parents:
+        owner = getattr(owner, parent)
+    original = inspect.getattr_static(owner, attr)
+    name = f"{module.__name__}.{path}"
+
+    if isinstance(original, staticmethod):
+        replacement = staticmethod(_wrap(name, original.__func__, size_arg))
+    elif isinstance(original, classmethod):
+        replacement = classmethod(_wrap(name, original.__func__, size_arg))
+    else:
+        replacement = _wrap(name, original, size_arg)
+    setattr(owner, attr, replacement)
+    _patches.append((owner, attr, original))
+
+
+def _reset_facade():
+    # The ciphers facade keeps every name it resolved in its globals. Drop
+    # those, so they are looked up again and pick up the wrappers (enable)
+    # or the originals (disable).
+    facade = sys.modules.get('ciphers')
+    if facade is None:
+        return
+    for name in getattr(facade, 'EXPORTS', ()):
+        facade.__dict__.pop(name, None)
+
+
+def enable(modules=None):
+    """
+    Starts measuring. modules: names from HOT_PATHS (default: all of them).
+    Modules that aren't imported yet are imported.
+    """
+    if _patches:
+        return
+    for module_name in modules or HOT_PATHS:
+        module = importlib.import_module(module_name)
+        for path, size_arg in HOT_PATHS[module_name]:
+            _patch(module, path, size_arg)
+    _reset_facade()
+
+
+def disable():
+    """Stops measuring and restores the original functions (counts are kept)."""
+    while _patches:
+        owner, attr, original = _patches.pop()
+        setattr(owner, attr, original)
+    _reset_facade()
+
+
+def is_enabled():
+    return bool(_patches)
+
+
+def reset():
+    """Zeroes the call counts, times and byte counts."""
+    for stats in _stats.values():
+        stats[:] = [0, 0.0, 0]
+
+
+@contextmanager
+def instrumented(modules=None):
+    """Measures only the code inside the with block."""
+    enable(modules)
+    try:
+        yield
+    finally:
+        disable()
+
+
+# --- Export ---
+
+def _cache_stats():
+    caches = {}
+    for module_name, attr in CACHES:
+        module = sys.modules.get(module_name) # only report what's loaded
+        func = getattr(module, attr, None)
+        if func is None or not hasattr(func, 'cache_info'):
+            continue
+        info = func.cache_info()
+        lookups = info.hits + info.misses
+        caches[f"{module_name}.{attr}"] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
+    return caches
+
+
+def snapshot():
+    """
+    Current numbers as a dict:
+        {'enabled': bool,
+         'functions': {name: {'calls', 'seconds', 'bytes', 'avg_us'}},
+         'caches': {name: {'hits', 'misses', 'size', 'maxsize', 'hit_rate'}}}
+    """
+    functions = {}
+    for name, (calls, seconds, processed) in sorted(_stats.items()):
+        if calls:
+            functions[name] = {
+                'calls': calls,
+                'seconds': seconds,
+                'bytes': processed,
+                'avg_us': seconds / calls * 1e6,
+            }
+    return {'enabled': is_enabled(), 'functions': functions, 'caches': _cache_stats()}
+
+
+def prometheus_text(prefix='cipher'):
+    """The snapshot in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, label, values):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for key, value in values:
+            lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+    functions = data['functions'].items()
+    caches = data['caches'].items()
+    metric('calls_total', 'counter', "Calls per instrumented function.", 'function',
+           [(k, v['calls']) for k, v in functions])
+    metric('seconds_total', 'counter', "Cumulative time per instrumented function.", 'function',
+           [(k, repr(v['seconds'])) for k, v in functions])
+    metric('bytes_total', 'counter', "Bytes (or items) processed per instrumented function.", 'function',
+           [(k, v['bytes']) for k, v in functions if v['bytes']])
+    metric('cache_hits_total', 'counter', "Cache hits.", 'cache', [(k, v['hits']) for k, v in caches])
+    metric('cache_misses_total', 'counter', "Cache misses.", 'cache', [(k, v['misses']) for k, v in caches])
+    metric('cache_hit_ratio', 'gauge', "Cache hits / lookups.", 'cache',
+           [(k, repr(v['hit_rate'])) for k, v in caches])
+    return '\n'.join(lines) + '\n'
+
+
+# --- Profiling ---
+
+@contextmanager
+def profiled(output=None, tool='cprofile', limit=25, sort='cumulative'):
+    """
+    Profiles the with block and writes a report.
+
+    Args:
+        output: file path or file-like object (default: stderr).
+        tool (str): 'cprofile' (where the time goes) or 'tracemalloc'
+            (which lines allocate the most memory, plus the peak).
+        limit (int): Number of entries in the report.
+        sort (str): pstats sort key for cProfile.
+    """
+    if tool not in ('cprofile', 'tracemalloc'):
+        raise ValueError("tool must be 'cprofile' or 'tracemalloc'.")
+
+    report = io.StringIO()
+    try:
+        if tool == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield profile
+            finally:
+                profile.disable()
+                pstats.Stats(profile, stream=report).sort_stats(sort).print_stats(limit)
+        else:
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            try:
+                yield None
+            finally:
+                after = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if not was_tracing:
+                    tracemalloc.stop()
+                report.write(f"Traced memory: {current / 1e6:.2f} MB now, {peak / 1e6:.2f} MB peak\n")
+                report.write(f"Top {limit} allocations (by line, compared to the start of the block):\n")
+                for stat in after.compare_to(before, 'lineno')[:limit]:
+                    report.write(f"{stat}\n")
+    finally:
+        # The report is written even if the block raised
+        if output is None:
+            sys.stderr.write(report.getvalue())
+        elif isinstance(output, str):
+            with open(output, 'w') as f:
+                f.write(report.getvalue())
+        else:
+            output.write(report.getvalue())
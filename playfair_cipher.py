@@ -1,3 +1,6 @@
+import re
+from functools import lru_cache
+
 def generate_key_table(key):
     # 1. Sanitize key: uppercase, replace J with I, remove non-alpha
     key = key.upper().replace('J', 'I')
@@ -43,6 +46,118 @@ def prepare_plaintext(text, filler='X'):
             
     return prepared_text
 
+# --- Streaming Digraphs ---
+
+# Characters read at a time from file-like input
+CHUNK_SIZE = 64 * 1024
+
+# One digraph per match: a letter, plus the next letter unless it's the same
+# one (then the second group is empty and the filler is used)
+_DIGRAPH_RE = re.compile(r'(.)((?!\1).)?', re.S)
+
+def _read_chunks(source):
+    # Accepts a file-like object (anything with .read) or an iterable of strings
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(CHUNK_SIZE), '')
+    return source
+
+def _digraph_batches(source, filler='X'):
+    # Yields the digraphs of each input chunk as one list, so only one
+    # chunk's worth is in memory at a time. A letter left over at the end of
+    # a chunk is carried over, since it may pair with the next chunk's first.
+    pending = ''
+    for chunk in _read_chunks(source):
+        # Same sanitizing as prepare_plaintext; it works per character, so
+        # it gives the same result chunk by chunk
+        text = pending + ''.join(filter(str.isalpha, chunk.upper().replace('J', 'I')))
+        pairs = _DIGRAPH_RE.findall(text)
+        # A single letter can only be last if it's a lone letter at the end
+        # (a doubled letter is always followed by its twin): wait for more input
+        pending = pairs.pop()[0] if pairs and not pairs[-1][1] else ''
+        if pairs:
+            yield [char1 + (char2 or filler) for char1, char2 in pairs]
+    if pending:
+        yield [pending + filler]
+
+def iter_digraphs(source, filler='X'):
+    """
+    Streaming version of prepare_plaintext.
+
+    Args:
+        source: A file-like object or an iterable of string chunks.
+        filler (str): Letter used to split doubled letters and pad the end.
+
+    Yields:
+        str: The same digraphs as prepare_plaintext(whole_text), one at a time.
+    """
+    for batch in _digraph_batches(source, filler):
+        yield from batch
+
+# --- Compiled Key ---
+# All 25 x 25 = 625 possible digraphs are worked out once per key (for
+# both directions), so processing a message is one dict lookup per pair
+# instead of the same-row / same-column / rectangle branches.
+class PlayfairKey:
+    def __init__(self, key):
+        self.table, self.coords = generate_key_table(key)
+        self.encrypt_map = self._build_map(1)
+        self.decrypt_map = self._build_map(-1)
+
+    def _build_map(self, direction):
+        # direction: 1 for encrypt, -1 for decrypt
+        table = self.table
+        mapping = {}
+        for p1, (row1, col1) in self.coords.items():
+            for p2, (row2, col2) in self.coords.items():
+                if row1 == row2: # Case 1: Same row
+                    pair = table[row1][(col1 + direction) % 5] + table[row1][(col2 + direction) % 5]
+                elif col1 == col2: # Case 2: Same column
+                    pair = table[(row1 + direction) % 5][col1] + table[(row2 + direction) % 5][col2]
+                else: # Case 3: Rectangle
+                    pair = table[row1][col2] + table[row2][col1]
+                mapping[p1 + p2] = pair
+        return mapping
+
+    def _mapping(self, mode):
+        if mode == 'encrypt':
+            return self.encrypt_map
+        if mode == 'decrypt':
+            return self.decrypt_map
+        raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
+
+    @staticmethod
+    def _translate(mapping, source):
+        for batch in _digraph_batches(source):
+            yield "".join(map(mapping.__getitem__, batch))
+
+    def process(self, text, mode):
+        return "".join(self._translate(self._mapping(mode), [text]))
+
+    def process_stream(self, source, mode):
+        # Lazily processes a file-like object or iterable of chunks and
+        # yields the output chunk by chunk (memory use stays constant)
+        return self._translate(self._mapping(mode), source)
+
+    def encrypt(self, text):
+        return self.process(text, 'encrypt')
+
+    def decrypt(self, text):
+        return self.process(text, 'decrypt')
+
+    # Bulk methods: many messages under the same key
+    def encrypt_many(self, texts):
+        return [self.process(text, 'encrypt') for text in texts]
+
+    def decrypt_many(self, texts):
+        return [self.process(text, 'decrypt') for text in texts]
+
+# Number of compiled keys kept in memory (least recently used are evicted)
+KEY_CACHE_SIZE = 256
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_key(key):
+    return PlayfairKey(key)
+
 def playfair_cipher(text, key, mode):
     """
     Encrypts or decrypts text using the Playfair cipher.
@@ -58,50 +173,25 @@ def playfair_cipher(text, key, mode):
     if mode not in ['encrypt', 'decrypt']:
         raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
 
-    table, coords = generate_key_table(key)
-    digraphs = prepare_plaintext(text)
-    result = []
-
-    # Set direction for shift (1 for encrypt, -1 for decrypt)
-    direction = 1 if mode == 'encrypt' else -1
-
-    for d in digraphs:
-        p1, p2 = d[0], d[1]
-        row1, col1 = coords[p1]
-        row2, col2 = coords[p2]
-
-        if row1 == row2: # Case 1: Same row
-            new_col1 = (col1 + direction) % 5
-            new_col2 = (col2 + direction) % 5
-            result.append(table[row1][new_col1])
-            result.append(table[row1][new_col2])
-        elif col1 == col2: # Case 2: Same column
-            new_row1 = (row1 + direction) % 5
-            new_row2 = (row2 + direction) % 5
-            result.append(table[new_row1][col1])
-            result.append(table[new_row2][col2])
-        else: # Case 3: Rectangle
-            # The rule is the same for encrypt and decrypt
-            result.append(table[row1][col2])
-            result.append(table[row2][col1])
-            
-    return "".join(result)
+    # The key table and digraph maps are built once per key and cached
+    return compile_key(key).process(text, mode)
 
 
 # --- Example Usage ---
 
-# 1. Define message and key
-key = "PLAYFAIR EXAMPLE"
-plaintext = "Hide the gold in the tree stump"
-
-# 2. Encrypt
-encrypted_text = playfair_cipher(plaintext, key, 'encrypt')
-print(f"Plaintext:  {plaintext}")
-print(f"Keyword:    {key}")
-print(f"Encrypted:  {encrypted_text}")
-
-# 3. Decrypt
-decrypted_text = playfair_cipher(encrypted_text, key, 'decrypt')
-print(f"Decrypted:  {decrypted_text}") 
-# Note: The decrypted text will be uppercase, without spaces, J->I, and with filler 'X's.
-# This is an inherent property of the classic Playfair cipher.
\ No newline at end of file
+if __name__ == '__main__':
+    # 1. Define message and key
+    key = "PLAYFAIR EXAMPLE"
+    plaintext = "Hide the gold in the tree stump"
+
+    # 2. Encrypt
+    encrypted_text = playfair_cipher(plaintext, key, 'encrypt')
+    print(f"Plaintext:  {plaintext}")
+    print(f"Keyword:    {key}")
+    print(f"Encrypted:  {encrypted_text}")
+
+    # 3. Decrypt
+    decrypted_text = playfair_cipher(encrypted_text, key, 'decrypt')
+    print(f"Decrypted:  {decrypted_text}")
+    # Note: The decrypted text will be uppercase, without spaces, J->I, and with filler 'X's.
+    # This is an inherent property of the classic Playfair cipher.
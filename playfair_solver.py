@@ -0,0 +1,306 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from playfair_cipher import generate_key_table, playfair_cipher
+
+# The Playfair alphabet (no 'J'), same as generate_key_table
+ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+
+# Share of the quadgram score that comes from the quadgram counts; the rest
+# comes from a bigram chain P(ab) P(c|b) P(d|c), so quadgrams that are rare
+# or missing in the training text still get a sensible score
+QUADGRAM_WEIGHT = 0.8
+
+# Small built-in training text, used when no quadgram file is given.
+# For real traffic, pass a file of quadgram counts (see load_quadgrams);
+# statistics from a large corpus make the search far more reliable.
+DEFAULT_CORPUS = """
+It was the best of times, it was the worst of times, it was the age of wisdom, it was the
+age of foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the
+season of Light, it was the season of Darkness, it was the spring of hope, it was the winter
+of despair, we had everything before us, we had nothing before us, we were all going direct
+to Heaven, we were all going direct the other way. In short, the period was so far like the
+present period, that some of its noisiest authorities insisted on its being received, for
+good or for evil, in the superlative degree of comparison only. There were a king with a
+large jaw and a queen with a plain face, on the throne of England; there were a king with a
+large jaw and a queen with a fair face, on the throne of France. In both countries it was
+clearer than crystal to the lords of the State preserves of loaves and fishes, that things
+in general were settled for ever.
+Four score and seven years ago our fathers brought forth on this continent, a new nation,
+conceived in Liberty, and dedicated to the proposition that all men are created equal. Now
+we are engaged in a great civil war, testing whether that nation, or any nation so conceived
+and so dedicated, can long endure. We are met on a great battle-field of that war. We have
+come to dedicate a portion of that field, as a final resting place for those who here gave
+their lives that that nation might live. It is altogether fitting and proper that we should
+do this. But, in a larger sense, we can not dedicate, we can not consecrate, we can not
+hallow this ground. The brave men, living and dead, who struggled here, have consecrated it,
+far above our poor power to add or detract. The world will little note, nor long remember
+what we say here, but it can never forget what they did here. It is for us the living,
+rather, to be dedicated here to the unfinished work which they who fought here have thus far
+so nobly advanced. It is rather for us to be here dedicated to the great task remaining
+before us, that from these honored dead we take increased devotion to that cause for which
+they gave the last full measure of devotion, that we here highly resolve that these dead
+shall not have died in vain, that this nation, under God, shall have a new birth of freedom,
+and that government of the people, by the people, for the people, shall not perish from the
+earth.
+"""
+
+
+# --- Quadgram Statistics ---
+# log10 probabilities of all 26^4 quadgrams, indexed by the base-26 code
+# a*17576 + b*676 + c*26 + d
+
+def _quadgram_array(counts):
+    counts = counts.astype(np.float64)
+    grid = counts.reshape(26, 26, 26, 26)
+
+    # Bigram statistics taken from the quadgram counts (first two letters),
+    # with a little smoothing so no bigram has probability 0
+    bigrams = grid.sum(axis=(2, 3)) + 0.5
+    following = bigrams / bigrams.sum(axis=1, keepdims=True) # P(next | letter)
+    chain = ((bigrams / bigrams.sum())[:, :, None, None]
+             * following[None, :, :, None] * following[None, None, :, :])
+
+    p = QUADGRAM_WEIGHT * grid / counts.sum() + (1 - QUADGRAM_WEIGHT) * chain
+    return np.log10(p).ravel()
+
+def build_quadgrams(corpus):
+    # Counts the quadgrams of an English text (letters only, J kept as I
+    # since Playfair plaintext never contains J)
+    data = np.frombuffer(corpus.upper().replace('J', 'I').encode('ascii', 'ignore'), dtype=np.uint8)
+    letters = data[(data >= ord('A')) & (data <= ord('Z'))].astype(np.int64) - ord('A')
+    codes = letters[:-3] * 17576 + letters[1:-2] * 676 + letters[2:-1] * 26 + letters[3:]
+    return _quadgram_array(np.bincount(codes, minlength=26 ** 4))
+
+def load_quadgrams(path):
+    # Reads a file with one "QUAD COUNT" pair per line (e.g. "TION 13168375")
+    counts = np.zeros(26 ** 4, dtype=np.int64)
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 2 or len(parts[0]) != 4:
+                continue
+            quad = parts[0].upper()
+            code = 0
+            for char in quad:
+                code = code * 26 + ord(char) - ord('A')
+            counts[code] += int(parts[1])
+    return _quadgram_array(counts)
+
+@lru_cache(maxsize=None)
+def _cached_quadgrams(path):
+    # One table per process (each worker builds or loads it once)
+    if path is None:
+        return build_quadgrams(DEFAULT_CORPUS)
+    return load_quadgrams(path)
+
+
+# --- Decryption by Position ---
+# Where a digraph goes only depends on where its two letters sit in the
+# square, not on the key. So for every pair of positions (p1 * 25 + p2) we
+# store the two positions of the decrypted pair once, and decrypting under
+# a key becomes: letters -> positions -> table lookup -> letters.
+
+def _build_position_table():
+    # table[p1 * 25 + p2] = (q1, q2)
+    table = np.empty((625, 2), dtype=np.int64)
+    for p1 in range(25):
+        row1, col1 = divmod(p1, 5)
+        for p2 in range(25):
+            row2, col2 = divmod(p2, 5)
+            if row1 == row2: # Case 1: Same row, shift left
+                q1, q2 = row1 * 5 + (col1 - 1) % 5, row2 * 5 + (col2 - 1) % 5
+            elif col1 == col2: # Case 2: Same column, shift up
+                q1, q2 = ((row1 - 1) % 5) * 5 + col1, ((row2 - 1) % 5) * 5 + col2
+            else: # Case 3: Rectangle
+                q1, q2 = row1 * 5 + col2, row2 * 5 + col1
+            table[p1 * 25 + p2] = (q1, q2)
+    return table
+
+DECRYPT_POSITIONS = _build_position_table()
+
+
+class _Scorer:
+    # Scores candidate squares against one ciphertext. All arrays are
+    # allocated once here and reused, so scoring a candidate doesn't
+    # allocate anything new.
+    #
+    # Every candidate is decrypted and scored in full. Scoring only the
+    # quadgrams whose letters changed doesn't pay off for Playfair: a
+    # single letter swap moves every digraph that contains either letter
+    # or decrypts onto either position, which touches about half of the
+    # quadgrams, and picking those out costs more than the full lookup.
+    def __init__(self, ciphertext, quadgrams):
+        self.letters = np.array([ord(c) - ord('A') for c in ciphertext], dtype=np.int64)
+        n = len(self.letters)
+        self.quadgrams = quadgrams
+        self.positions = np.empty(n, dtype=np.int64)
+        self.pair = np.empty(n // 2, dtype=np.int64)
+        self.plain_positions = np.empty((n // 2, 2), dtype=np.int64)
+        self.plain = np.empty(n, dtype=np.int64)
+        self.codes = np.empty(n - 3, dtype=np.int64)
+        self.tmp = np.empty(n - 3, dtype=np.int64)
+        self.logp = np.empty(n - 3, dtype=np.float64)
+
+    def score(self, square, positions):
+        # square: position -> letter (0..25), positions: letter -> position
+        positions.take(self.letters, out=self.positions)
+        np.multiply(self.positions[0::2], 25, out=self.pair)
+        self.pair += self.positions[1::2]
+        DECRYPT_POSITIONS.take(self.pair, axis=0, out=self.plain_positions)
+        square.take(self.plain_positions.ravel(), out=self.plain)
+
+        # Quadgram codes a*17576 + b*676 + c*26 + d, then look up and add up
+        plain, codes, tmp = self.plain, self.codes, self.tmp
+        np.multiply(plain[:-3], 17576, out=codes)
+        np.multiply(plain[1:-2], 676, out=tmp)
+        codes += tmp
+        np.multiply(plain[2:-1], 26, out=tmp)
+        codes += tmp
+        codes += plain[3:]
+        self.quadgrams.take(codes, out=self.logp)
+        return float(self.logp.sum())
+
+
+# --- Key Square Moves ---
+# The square is a 25-entry array, position (row * 5 + col) -> letter.
+# All moves change it in place.
+
+_POSITIONS = np.arange(25)
+
+def _swap_letters(square, rng):
+    i = rng.randrange(25)
+    j = (i + 1 + rng.randrange(24)) % 25 # any other position
+    square[i], square[j] = square[j], square[i]
+
+def _swap_rows(square, rng):
+    r1, r2 = rng.sample(range(5), 2)
+    grid = square.reshape(5, 5)
+    grid[[r1, r2]] = grid[[r2, r1]]
+
+def _swap_columns(square, rng):
+    c1, c2 = rng.sample(range(5), 2)
+    grid = square.reshape(5, 5)
+    grid[:, [c1, c2]] = grid[:, [c2, c1]]
+
+def _flip_rows(square, rng):
+    square.reshape(5, 5)[:] = square.reshape(5, 5)[::-1]
+
+def _flip_columns(square, rng):
+    square.reshape(5, 5)[:] = square.reshape(5, 5)[:, ::-1]
+
+def _transpose(square, rng):
+    square.reshape(5, 5)[:] = square.reshape(5, 5).T.copy()
+
+def _reverse(square, rng):
+    square[:] = square[::-1]
+
+# Mostly single letter swaps, with the occasional bigger move
+# (this mix is the usual choice for Playfair hill climbing)
+_MOVES = ([_swap_letters] * 90 + [_swap_rows] * 2 + [_swap_columns] * 2
+          + [_flip_rows] * 2 + [_flip_columns] * 2 + [_transpose, _reverse])
+
+
+def _prepare_ciphertext(ciphertext):
+    text = ''.join(filter(str.isalpha, ciphertext.upper().replace('J', 'I')))
+    if len(text) % 2 != 0 or len(text) < 8:
+        raise ValueError("Ciphertext must have an even number of letters (at least 8).")
+    return text
+
+def _anneal(ciphertext, seed, iterations, start_temp, quadgram_path):
+    # One independent simulated annealing run (runs inside a worker process).
+    # The temperature drops linearly to 0; worse squares are accepted with
+    # probability exp(delta / T), which lets the search escape local maxima.
+    rng = random.Random(seed)
+    scorer = _Scorer(ciphertext, _cached_quadgrams(quadgram_path))
+
+    square = np.array([ord(c) - ord('A') for c in ALPHABET], dtype=np.int64)
+    rng.shuffle(square)
+    positions = np.zeros(26, dtype=np.int64)
+    positions[square] = np.arange(25)
+    candidate = square.copy()
+    cand_positions = positions.copy()
+
+    current = scorer.score(square, positions)
+    best, best_square = current, square.copy()
+
+    for step in range(iterations):
+        temp = start_temp * (1 - step / iterations)
+        candidate[:] = square
+        rng.choice(_MOVES)(candidate, rng)
+        cand_positions[candidate] = _POSITIONS
+        score = scorer.score(candidate, cand_positions)
+
+        delta = score - current
+        if delta >= 0 or (temp > 0 and rng.random() < math.exp(delta / temp)):
+            square, candidate = candidate, square
+            positions, cand_positions = cand_positions, positions
+            current = score
+            if current > best:
+                best, best_square = current, square.copy()
+
+    return best, ''.join(chr(ord('A') + c) for c in best_square)
+
+def solve_playfair(ciphertext, restarts=None, iterations=200000, start_temp=None,
+                   workers=None, quadgram_path=None, seed=None):
+    """
+    Recovers a Playfair key square from ciphertext alone.
+
+    Independent annealing restarts run across a process pool and the best
+    result (highest quadgram log-probability) is kept.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        restarts (int): Number of independent runs (defaults to the CPU count).
+        iterations (int): Candidate squares tried per run.
+        start_temp (float): Starting temperature (defaults to scale with length).
+        workers (int): Worker processes (defaults to the CPU count).
+        quadgram_path (str): Optional file of quadgram counts.
+        seed (int): Makes the runs reproducible.
+
+    Returns:
+        tuple: (key square as a 25-letter string, score, decrypted text).
+        The square can be used as the key for playfair_cipher.
+    """
+    text = _prepare_ciphertext(ciphertext)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if restarts is None:
+        restarts = workers
+    if start_temp is None:
+        start_temp = 10 + 0.087 * (len(text) - 84) if len(text) > 84 else 10
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(restarts)]
+    jobs = [(text, s, iterations, start_temp, quadgram_path) for s in seeds]
+
+    if workers <= 1 or restarts <= 1:
+        results = [_anneal(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_anneal, *zip(*jobs)))
+
+    score, square = max(results)
+    return square, score, playfair_cipher(text, square, 'decrypt')
+
+def square_table(square):
+    # The 5x5 table for a solved square, in generate_key_table's format
+    return generate_key_table(square)
+
+
+if __name__ == '__main__':
+    # Long ciphertexts are much easier to break. The built-in corpus is
+    # used as the message here, so the small default statistics fit it well.
+    plaintext = DEFAULT_CORPUS[:1200]
+    ciphertext = playfair_cipher(plaintext, 'MONARCHY', 'encrypt')
+    print(f"Ciphertext: {ciphertext[:60]}...")
+    square, score, decrypted = solve_playfair(ciphertext, restarts=4, seed=1)
+    table, _ = square_table(square)
+    print(f"Best score: {score:.1f}")
+    for row in table:
+        print('  ' + ' '.join(row))
+    print(f"Decrypted:  {decrypted[:60]}...")
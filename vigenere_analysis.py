@@ -0,0 +1,197 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from caesar_cipher import ENGLISH_FREQUENCIES
+from vigenere_cipher import vigenere_cipher
+
+# Index of coincidence of English text (and of uniformly random letters)
+ENGLISH_IC = 0.0667
+RANDOM_IC = 1 / 26
+
+# Stands for a letter outside a-z in the arrays from _letters
+OTHER_LETTER = 26
+
+# Repeated n-grams of this length are used for the Kasiski examination
+KASISKI_NGRAM = 3
+
+# 1 / English frequency of each letter, used for chi-squared scoring
+_FREQ = np.array(ENGLISH_FREQUENCIES) / sum(ENGLISH_FREQUENCIES)
+_I, _S = np.indices((26, 26))
+# _WEIGHTS[i, s] = 1 / freq(letter i shifted back by s)
+_WEIGHTS = 1 / _FREQ[(_I - _S) % 26]
+
+
+def _letters(text):
+    """
+    Letters of the text as numbers 0..25, one per key position.
+
+    Only letters move the key forward, and vigenere_cipher counts every
+    isalpha() character, including ones outside a-z such as 'é'. Those
+    still take up a key position (so the columns stay aligned with the
+    cipher) but show up as OTHER_LETTER, which the statistics ignore.
+    """
+    if text.isascii():
+        data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        letters = (data | 0x20) - ord('a')
+        return letters[letters < 26].astype(np.int64)
+    # Same rule as vigenere_cipher: alphabet.find(char.lower())
+    alphabet = 'abcdefghijklmnopqrstuvwxyz'
+    positions = (alphabet.find(char.lower()) for char in text if char.isalpha())
+    return np.array([p if p >= 0 else OTHER_LETTER for p in positions], dtype=np.int64)
+
+
+def _index_of_coincidence(counts):
+    # counts: (..., 26) letter counts, IC along the last axis
+    n = counts.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ic = (counts * (counts - 1)).sum(axis=-1) / (n * (n - 1))
+    return np.nan_to_num(ic)
+
+
+def _column_counts(letters, length):
+    # Letter counts for each of the `length` key columns, shape (length, 26)
+    columns = np.arange(len(letters)) % length
+    counts = np.bincount(columns * 27 + letters, minlength=length * 27).reshape(length, 27)
+    return counts[:, :26] # without OTHER_LETTER
+
+
+def kasiski_spacings(letters, n=KASISKI_NGRAM):
+    """
+    Distances between repeated n-grams.
+
+    Every n-gram is turned into one base-26 number and the positions are
+    sorted by that number (a position index), so equal n-grams end up next
+    to each other. That is O(L log L) instead of comparing substrings pairwise.
+    """
+    if len(letters) < n + 1:
+        return np.empty(0, dtype=np.int64)
+    codes = np.zeros(len(letters) - n + 1, dtype=np.int64)
+    for i in range(n):
+        codes = codes * 27 + letters[i:len(letters) - n + 1 + i]
+    # n-grams with an OTHER_LETTER get a code of their own, so they never repeat
+    other = np.flatnonzero(np.convolve(letters == OTHER_LETTER, np.ones(n, dtype=bool), 'valid'))
+    codes[other] = -1 - other
+    order = np.argsort(codes, kind='stable') # positions stay increasing per n-gram
+    same = codes[order[1:]] == codes[order[:-1]]
+    return order[1:][same] - order[:-1][same]
+
+
+def estimate_key_lengths(ciphertext, max_length=20, top=3):
+    """
+    Ranks possible key lengths for a Vigenère ciphertext.
+
+    Two signals are combined:
+      - index of coincidence: with the right length, every column is a
+        Caesar cipher and looks like English (IC close to 0.0667).
+      - Kasiski: repeated n-grams are usually spaced a multiple of the key
+        length apart, so the right length divides many spacings.
+
+    Returns:
+        list: (length, score, average IC) tuples, best first.
+    """
+    letters = _letters(ciphertext) if isinstance(ciphertext, str) else ciphertext
+    max_length = max(1, min(max_length, len(letters) // 2))
+    spacings = kasiski_spacings(letters)
+
+    ranked = []
+    for length in range(1, max_length + 1):
+        ic = _index_of_coincidence(_column_counts(letters, length)).mean()
+        # How far the IC has moved from random towards English (0..1)
+        ic_score = max(ic - RANDOM_IC, 0) / (ENGLISH_IC - RANDOM_IC)
+        if len(spacings):
+            ic_score *= (spacings % length == 0).mean()
+        ranked.append((length, float(ic_score), float(ic)))
+
+    ranked.sort(key=lambda r: (-r[1], r[0]))
+    return ranked[:top]
+
+
+def _solve_columns(letters, length):
+    # Best shift for every column at once, by chi-squared against English.
+    # chi2 = sum(o^2 / e) - N, so all 26 shifts of all columns come from
+    # one matrix product.
+    counts = _column_counts(letters, length).astype(np.float64)
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (counts ** 2) @ _WEIGHTS / totals - totals
+    return scores.argmin(axis=1)
+
+
+def _shortest_period(key):
+    # 'LEMONLEMON' -> 'LEMON' (a multiple of the real key length solves the same)
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            return key[:period]
+    return key
+
+
+def _chi_squared(text):
+    counts = np.bincount(_letters(text), minlength=27)[:26].astype(np.float64)
+    expected = counts.sum() * _FREQ
+    if not expected.any():
+        return float('inf')
+    return float(((counts - expected) ** 2 / expected).sum())
+
+
+def crack_vigenere(ciphertext, max_length=20, top=3):
+    """
+    Recovers likely keys for a Vigenère ciphertext.
+
+    Args:
+        ciphertext (str): The encrypted text.
+        max_length (int): Longest key length to try.
+        top (int): Number of candidates to return.
+
+    Returns:
+        list: (key, score, plaintext) tuples, best (lowest chi-squared) first.
+    """
+    letters = _letters(ciphertext)
+    if not (letters != OTHER_LETTER).any():
+        return []
+
+    candidates = {}
+    # Solve a few more lengths than asked for; multiples of the right length
+    # collapse to the same key
+    for length, _, _ in estimate_key_lengths(letters, max_length, top=top * 2):
+        shifts = _solve_columns(letters, length)
+        key = _shortest_period(''.join(chr(ord('A') + s) for s in shifts))
+        if key not in candidates:
+            plaintext = vigenere_cipher(ciphertext, key, 'decrypt')
+            candidates[key] = (key, _chi_squared(plaintext), plaintext)
+
+    return sorted(candidates.values(), key=lambda c: c[1])[:top]
+
+
+def _crack_one(args):
+    ciphertext, max_length, top = args
+    return crack_vigenere(ciphertext, max_length, top)
+
+
+def crack_vigenere_many(ciphertexts, max_length=20, top=3, workers=None):
+    """
+    Runs crack_vigenere on many ciphertexts across a process pool.
+
+    Returns:
+        list: One result list (as from crack_vigenere) per ciphertext, in order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    jobs = [(c, max_length, top) for c in ciphertexts]
+    if workers <= 1 or len(jobs) <= 1:
+        return [_crack_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_crack_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+if __name__ == '__main__':
+    plaintext = ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+                 "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+                 "incredulity, it was the season of Light, it was the season of Darkness, it was "
+                 "the spring of hope, it was the winter of despair.")
+    ciphertext = vigenere_cipher(plaintext, 'DICKENS', 'encrypt')
+    print(f"Ciphertext:  {ciphertext}")
+    print(f"Key lengths: {estimate_key_lengths(ciphertext)}")
+    for key, score, decrypted in crack_vigenere(ciphertext):
+        print(f"{key:<12} chi2={score:8.1f}  {decrypted[:60]}...")
@@ -1,9 +1,15 @@
+# Texts at least this long go through the NumPy engine (vigenere_cipher_np)
+VECTORIZE_THRESHOLD = 10000
+
 def vigenere_cipher(text, key, mode):
     # Sanitize the key: remove non-alphabetic characters and convert to lowercase
     key = ''.join(filter(str.isalpha, key)).lower()
     if not key:
         raise ValueError("The key must contain at least one alphabetic character.")
 
+    if len(text) >= VECTORIZE_THRESHOLD:
+        return vigenere_cipher_np(text, key, mode)
+
     result = []
     key_index = 0
     alphabet = 'abcdefghijklmnopqrstuvwxyz'
@@ -38,28 +44,105 @@ def vigenere_cipher(text, key, mode):
     return "".join(result)
 
 
-plaintext1 = "ATTACKATDAWN"
-keyword1 = "LEMON"
+def _tile(key_shifts, length):
+    # Repeat the key shifts to cover `length` letters
+    import numpy as np
+    return np.tile(key_shifts, -(-length // len(key_shifts)))[:length]
+
+def vigenere_cipher_np(text, key, mode):
+    """
+    Vectorized Vigenère cipher, same output as vigenere_cipher.
+
+    The text becomes an array of character codes and a mask picks out the
+    letters. Only letters move the key forward, so the k-th letter of the
+    text uses key[k % len(key)]: the key shifts are simply tiled over the
+    letters. The shift is then applied to all letters in one operation,
+    keeping case and non-letter characters.
+    """
+    import numpy as np # only needed for large texts
+
+    key = ''.join(filter(str.isalpha, key)).lower()
+    if not key:
+        raise ValueError("The key must contain at least one alphabetic character.")
+
+    alphabet = 'abcdefghijklmnopqrstuvwxyz'
+    # Shifts are kept in 0..25 (a key letter outside a-z, e.g. 'é', gives
+    # find() == -1, the same as a shift of 25)
+    key_shifts = np.array([alphabet.find(k) % 26 for k in key], dtype=np.uint8)
+    if mode == 'decrypt':
+        key_shifts = (26 - key_shifts) % 26
+
+    if text.isascii():
+        # Usual case: one byte per character and 256-entry lookup tables
+        codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        table = np.arange(256, dtype=np.uint8)
+        is_letter_table = ((table | 0x20) >= ord('a')) & ((table | 0x20) <= ord('z'))
+        base_table = np.where(table < ord('a'), ord('A'), ord('a')).astype(np.uint8)
+
+        letter_idx = np.flatnonzero(is_letter_table[codes])
+        letters = codes[letter_idx]
+        base = base_table[letters]
+        shifted = (letters - base + _tile(key_shifts, len(letter_idx))) % 26 + base
+
+        result = codes.copy()
+        result[letter_idx] = shifted
+        return result.tobytes().decode('ascii')
+
+    # surrogatepass: lone surrogates (e.g. from errors='surrogateescape')
+    # are valid str and pass through unchanged, as in the loop version
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    is_lower = (codes >= ord('a')) & (codes <= ord('z'))
+    is_upper = (codes >= ord('A')) & (codes <= ord('Z'))
+    is_letter = is_lower | is_upper
+    positions = np.where(is_upper, codes.astype(np.int64) - ord('A'), codes.astype(np.int64) - ord('a'))
+
+    # Non-ASCII characters: decide per distinct character with the same str
+    # methods as vigenere_cipher (e.g. 'é' is a letter that isn't in the
+    # alphabet, so find() gives -1, just like in the loop version)
+    wide = np.flatnonzero(codes > 127)
+    values, inverse = np.unique(codes[wide], return_inverse=True)
+    chars = [chr(v) for v in values]
+    alpha = np.array([c.isalpha() for c in chars], dtype=bool)
+    upper = np.array([c.isupper() for c in chars], dtype=bool)
+    found = np.array([alphabet.find(c.lower()) for c in chars], dtype=np.int64)
+    is_letter[wide] = alpha[inverse]
+    is_upper[wide] = alpha[inverse] & upper[inverse]
+    positions[wide] = found[inverse]
+
+    letter_idx = np.flatnonzero(is_letter)
+    shifted = (positions[letter_idx] + _tile(key_shifts, len(letter_idx))) % 26
+    shifted += np.where(is_upper[letter_idx], ord('A'), ord('a'))
+
+    result = codes.copy()
+    result[letter_idx] = shifted
+    return result.tobytes().decode('utf-32-le', 'surrogatepass')
+
+# --- Example Usage ---
+
+if __name__ == '__main__':
+    # 1. A simple example
+    plaintext1 = "ATTACKATDAWN"
+    keyword1 = "LEMON"
 
-encrypted1 = vigenere_cipher(plaintext1, keyword1, 'encrypt')
-print(f"Plaintext:  {plaintext1}")
-print(f"Keyword:    {keyword1}")
-print(f"Encrypted:  {encrypted1}")
+    encrypted1 = vigenere_cipher(plaintext1, keyword1, 'encrypt')
+    print(f"Plaintext:  {plaintext1}")
+    print(f"Keyword:    {keyword1}")
+    print(f"Encrypted:  {encrypted1}")
 
-decrypted1 = vigenere_cipher(encrypted1, keyword1, 'decrypt')
-print(f"Decrypted:  {decrypted1}")
+    decrypted1 = vigenere_cipher(encrypted1, keyword1, 'decrypt')
+    print(f"Decrypted:  {decrypted1}")
 
-print("\n" + "-"*30 + "\n")
+    print("\n" + "-"*30 + "\n")
 
-# 2. A more complex example with mixed case and punctuation
-plaintext2 = "Cryptography is an interesting, if not always practical, subject!"
-keyword2 = "SecretKey123" # The '123' will be filtered out
+    # 2. A more complex example with mixed case and punctuation
+    plaintext2 = "Cryptography is an interesting, if not always practical, subject!"
+    keyword2 = "SecretKey123" # The '123' will be filtered out
 
-print(f"Plaintext:  {plaintext2}")
-print(f"Keyword:    {keyword2} (sanitized to 'secretkey')")
+    print(f"Plaintext:  {plaintext2}")
+    print(f"Keyword:    {keyword2} (sanitized to 'secretkey')")
 
-encrypted2 = vigenere_cipher(plaintext2, keyword2, 'encrypt')
-print(f"Encrypted:  {encrypted2}")
+    encrypted2 = vigenere_cipher(plaintext2, keyword2, 'encrypt')
+    print(f"Encrypted:  {encrypted2}")
 
-decrypted2 = vigenere_cipher(encrypted2, keyword2, 'decrypt')
-print(f"Decrypted:  {decrypted2}")
\ No newline at end of file
+    decrypted2 = vigenere_cipher(encrypted2, keyword2, 'decrypt')
+    print(f"Decrypted:  {decrypted2}")